@@ -371,7 +371,7 @@ class ThéodoreApp(ctk.CTk):
         # Description du modèle sélectionné
         self.model_description = ctk.CTkLabel(
             card,
-            text="🎯 Précis (large-v3) : Meilleure qualité, plus lent (~1.5x temps réel)",
+            text="🎯 Précis (large-v3-turbo) : Meilleure qualité, plus lent (~1.5x temps réel)",
             font=ctk.CTkFont(size=11),
             text_color=Colors.TEXT_MUTED,
             wraplength=360,
@@ -390,9 +390,9 @@ class ThéodoreApp(ctk.CTk):
         else:
             self.model_choice.set("precise")
             self.model_description.configure(
-                text="🎯 Précis (large-v3) : Meilleure qualité, plus lent (~1.5x temps réel)"
+                text="🎯 Précis (large-v3-turbo) : Meilleure qualité, plus lent (~1.5x temps réel)"
             )
-            self.log("📊 Modèle changé : Précis (large-v3)")
+            self.log("📊 Modèle changé : Précis (large-v3-turbo)")
     
     def create_actions_section(self):
         """Section des actions principales."""
@@ -926,7 +926,7 @@ class ThéodoreApp(ctk.CTk):
                 return
             
             # Afficher le modèle utilisé
-            model_name = "small (Rapide)" if model_type == "fast" else "large-v3 (Précis)"
+            model_name = "small (Rapide)" if model_type == "fast" else "large-v3-turbo (Précis)"
             self.message_queue.put((f"🎤 Modèle sélectionné : {model_name}", "info"))
             
             # Obtenir la durée de la vidéo
@@ -969,18 +969,24 @@ class ThéodoreApp(ctk.CTk):
             engine = get_engine(model_type)
             
             # Transcrire par segments de 30 secondes
+            # (l'audio des segments suivants est extrait pendant la transcription)
             segment_duration = 30
             all_segments = []
             
-            for start in range(0, int(duration), segment_duration):
-                end = min(start + segment_duration, duration)
-                progress = int((start / duration) * 100)
-                
-                self.message_queue.put((f"📝 Transcription... {progress}% ({timedelta(seconds=start)} / {timedelta(seconds=int(duration))})", "info"))
+            requested = [
+                (start, min(start + segment_duration, duration) - start)
+                for start in range(0, int(duration), segment_duration)
+            ]
+            
+            self.message_queue.put((f"📝 Transcription... 0% (0:00:00 / {timedelta(seconds=int(duration))})", "info"))
+            
+            for (start, length), result in zip(requested, engine.iter_video_segments(video_path, requested, with_words=False)):
+                end = start + length
+                progress = int((end / duration) * 100)
                 
-                segments = engine.transcribe_video_segment(video_path, start, end - start)
+                self.message_queue.put((f"📝 Transcription... {progress}% ({timedelta(seconds=int(end))} / {timedelta(seconds=int(duration))})", "info"))
                 
-                for seg_start, seg_end, text in segments:
+                for seg_start, seg_end, text in result["segments"]:
                     # Ajuster les timestamps absolus
                     abs_start = start + seg_start
                     abs_end = start + seg_end
@@ -9,6 +9,7 @@ NOUVEAU : Transcription vocale avec Whisper + sous-titres dynamiques style TikTo
 import os
 import sys
 import io
+import atexit
 import subprocess
 import tempfile
 from datetime import timedelta
@@ -33,7 +34,7 @@ try:
     # Essayer faster-whisper d'abord (plus performant)
     from transcription_engine import transcribe_segment as transcribe_segment_engine
     from transcription_engine import get_engine
-    TRANSCRIPTION_ENGINE = "faster-whisper-large-v3"
+    TRANSCRIPTION_ENGINE = "faster-whisper-large-v3-turbo"
     WHISPER_AVAILABLE = True
     
     def transcribe_segment(video_path, start_sec, duration):
@@ -41,9 +42,12 @@ try:
         return transcribe_segment_engine(video_path, start_sec, duration)
     
     def transcribe_segment_words(video_path, start_sec, duration):
-        """Transcription MOT PAR MOT pour sous-titres temps réel."""
+        """
+        Transcription MOT PAR MOT pour sous-titres temps réel.
+        Retourne {"words": [...], "segments": [...]} issus d'un seul passage Whisper.
+        """
         engine = get_engine()
-        return engine.transcribe_video_segment_words(video_path, start_sec, duration)
+        return engine.transcribe_video_segment_full(video_path, start_sec, duration)
     
 except ImportError:
     try:
@@ -126,7 +130,7 @@ def group_words_for_display(word_timestamps, words_per_group=WORDS_PER_GROUP):
             if group_end - group_start < MIN_WORD_DURATION * len(current_group):
                 group_end = group_start + MIN_WORD_DURATION * len(current_group)
             
-            group_text = " ".join([w[2] for w in current_group])
+            group_text = " ".join(w[2] for w in current_group)
             groups.append((group_start, group_end, group_text))
             current_group = []
     
@@ -139,7 +143,7 @@ def group_words_for_display(word_timestamps, words_per_group=WORDS_PER_GROUP):
         if group_end - group_start < MIN_WORD_DURATION * len(current_group):
             group_end = group_start + MIN_WORD_DURATION * len(current_group)
         
-        group_text = " ".join([w[2] for w in current_group])
+        group_text = " ".join(w[2] for w in current_group)
         groups.append((group_start, group_end, group_text))
     
     # S'assurer que les groupes ne se chevauchent pas
@@ -546,6 +550,36 @@ def split_into_shorts(segments):
     return shorts
 
 
+# Pool de fichiers de filtres FFmpeg, réutilisés d'un Short à l'autre
+# (évite de créer/supprimer un fichier temporaire pour chaque Short)
+_FILTER_SCRIPT_POOL = []
+
+
+def acquire_filter_script():
+    """Retourne le chemin d'un fichier de filtres libre (créé si le pool est vide)."""
+    try:
+        return _FILTER_SCRIPT_POOL.pop()
+    except IndexError:
+        fd, path = tempfile.mkstemp(prefix="short_filters_", suffix=".txt")
+        os.close(fd)
+        return path
+
+
+def release_filter_script(path):
+    """Remet un fichier de filtres dans le pool pour le Short suivant."""
+    _FILTER_SCRIPT_POOL.append(path)
+
+
+@atexit.register
+def _cleanup_filter_scripts():
+    """Supprime les fichiers du pool à la fermeture du programme."""
+    while _FILTER_SCRIPT_POOL:
+        try:
+            os.unlink(_FILTER_SCRIPT_POOL.pop())
+        except OSError:
+            pass
+
+
 def extract_short(video_path, start_sec, end_sec, output_path, vertical=False, add_subtitles=True):
     """
     Extrait un segment vidéo avec FFmpeg et sous-titres transcrits MOT PAR MOT.
@@ -561,19 +595,24 @@ def extract_short(video_path, start_sec, end_sec, output_path, vertical=False, a
     """
     duration = end_sec - start_sec
     word_transcription = None
+    transcription = None
     vf_filters = []
     
     # Transcription MOT PAR MOT avec timestamps précis
     if add_subtitles and ADD_SUBTITLES and USE_TRANSCRIPTION and WHISPER_AVAILABLE:
         print(f"         🎤 Transcription MOT PAR MOT ({TRANSCRIPTION_ENGINE})...")
-        word_transcription = transcribe_segment_words(video_path, start_sec, duration)
+        full_transcription = transcribe_segment_words(video_path, start_sec, duration)
         
-        if word_transcription:
+        if full_transcription and full_transcription["words"]:
+            word_transcription = full_transcription["words"]
             print(f"         ✅ {len(word_transcription)} mot(s) avec timestamps")
         else:
             print(f"         ⚠️ Fallback vers transcription par phrase")
-            # Fallback: transcription classique
-            transcription = transcribe_segment(video_path, start_sec, duration)
+            # Fallback: phrases issues du même passage Whisper (pas de 2e transcription)
+            if full_transcription is not None:
+                transcription = full_transcription["segments"]
+            else:
+                transcription = transcribe_segment(video_path, start_sec, duration)
             if transcription:
                 print(f"         ✅ {len(transcription)} phrase(s)")
     
@@ -581,9 +620,17 @@ def extract_short(video_path, start_sec, end_sec, output_path, vertical=False, a
     if vertical:
         vf_filters.append("crop=ih*9/16:ih,scale=1080:1920")
     
-    # Style des sous-titres
-    style = SUBTITLE_STYLE
-    y_expr = "(h-text_h)/2" if style['position'] == 'center' else ("h-80" if style['position'] == 'bottom' else "80")
+    # Style des sous-titres (lu une seule fois, hors des boucles drawtext)
+    position = SUBTITLE_STYLE['position']
+    y_expr = "(h-text_h)/2" if position == 'center' else ("h-80" if position == 'bottom' else "80")
+    drawtext_style = (
+        f":fontsize={SUBTITLE_STYLE['font_size']}"
+        f":fontcolor=yellow"
+        f":borderw=3"
+        f":bordercolor=black"
+        f":x=(w-text_w)/2"
+        f":y={y_expr}"
+    )
     
     # Mode MOT PAR MOT (prioritaire) - Style YouTube/TikTok
     if word_transcription:
@@ -598,18 +645,13 @@ def extract_short(video_path, start_sec, end_sec, output_path, vertical=False, a
             # Créer le filtre drawtext avec timing précis
             drawtext = (
                 f"drawtext=text='{clean_text}'"
-                f":fontsize={style['font_size']}"
-                f":fontcolor=yellow"
-                f":borderw=3"
-                f":bordercolor=black"
-                f":x=(w-text_w)/2"
-                f":y={y_expr}"
+                f"{drawtext_style}"
                 f":enable='between(t\\,{group_start:.3f}\\,{group_end:.3f})'"
             )
             vf_filters.append(drawtext)
     
     # Mode Phrase (fallback)
-    elif 'transcription' in dir() and transcription:
+    elif transcription:
         for start, end, text in transcription:
             clean_text = sanitize_text_for_ffmpeg(text)
             if not clean_text:
@@ -617,27 +659,29 @@ def extract_short(video_path, start_sec, end_sec, output_path, vertical=False, a
             
             drawtext = (
                 f"drawtext=text='{clean_text}'"
-                f":fontsize={style['font_size']}"
-                f":fontcolor=yellow"
-                f":borderw=3"
-                f":bordercolor=black"
-                f":x=(w-text_w)/2"
-                f":y={y_expr}"
+                f"{drawtext_style}"
                 f":enable='between(t\\,{start:.2f}\\,{end:.2f})'"
             )
             vf_filters.append(drawtext)
     
     # Construction de la commande FFmpeg
+    filter_script = None
     if vf_filters:
-        vf_filter = ",".join(vf_filters)
+        # Le graphe de filtres passe par un fichier du pool plutôt que par
+        # la ligne de commande (limitée à 32767 caractères sous Windows)
+        filter_script = acquire_filter_script()
+        with open(filter_script, 'w', encoding='utf-8') as f:
+            f.write(",".join(vf_filters))
         
         cmd = [
             FFMPEG_PATH,
             '-y',
+            '-loglevel', 'error',
+            '-nostats',
             '-ss', format_ffmpeg_time(start_sec),
             '-i', video_path,
             '-t', str(duration),
-            '-vf', vf_filter,
+            '-filter_script:v', filter_script,
             '-c:v', 'libx264',
             '-preset', 'fast',
             '-crf', '23',
@@ -651,6 +695,8 @@ def extract_short(video_path, start_sec, end_sec, output_path, vertical=False, a
         cmd = [
             FFMPEG_PATH,
             '-y',
+            '-loglevel', 'error',
+            '-nostats',
             '-ss', format_ffmpeg_time(start_sec),
             '-i', video_path,
             '-t', str(duration),
@@ -660,16 +706,14 @@ def extract_short(video_path, start_sec, end_sec, output_path, vertical=False, a
         ]
     
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+        # -loglevel error : stderr ne contient plus que les erreurs (pas de stats)
+        result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                text=True, timeout=300)
         success = result.returncode == 0
         
-        if not success and result.stderr:
-            # Afficher seulement les erreurs pertinentes
-            stderr_lines = result.stderr.split('\n')
-            for line in stderr_lines:
-                if 'Error' in line or 'error' in line:
-                    print(f"   ⚠️ FFmpeg: {line[:100]}")
-                    break
+        if not success and result.stderr.strip():
+            # Afficher seulement la première erreur
+            print(f"   ⚠️ FFmpeg: {result.stderr.strip().splitlines()[0][:100]}")
         
         return success
     except subprocess.TimeoutExpired:
@@ -678,6 +722,9 @@ def extract_short(video_path, start_sec, end_sec, output_path, vertical=False, a
     except Exception as e:
         print(f"   ❌ Erreur: {e}")
         return False
+    finally:
+        if filter_script:
+            release_filter_script(filter_script)
 
 
 def sanitize_text_for_ffmpeg(text):
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test de la transcription batchée de plusieurs segments d'une vidéo.
+Chaque phrase et chaque mot doivent rester dans les bornes de leur segment.
+"""
+import sys
+import os
+
+# Ajouter le chemin du projet
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from transcription_engine import get_engine
+
+def test_batch_transcription():
+    """Teste transcribe_video_segments_batch sur des segments contigus."""
+
+    # Trouver une vidéo de test
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    test_videos = [
+        os.path.join(project_root, "com_frat.mp4"),
+        os.path.join(project_root, "diane_ann.mp4"),
+    ]
+
+    video_path = None
+    for v in test_videos:
+        if os.path.exists(v):
+            video_path = v
+            break
+
+    if not video_path:
+        print("❌ Aucune vidéo de test trouvée")
+        return
+
+    print(f"📹 Vidéo de test: {os.path.basename(video_path)}")
+    print("=" * 50)
+
+    # Segments contigus de 5 s : la parole continue d'un segment à l'autre,
+    # le batch regroupe plusieurs segments dans une même fenêtre de 30 s
+    segments = [(start, 5) for start in range(0, 30, 5)]
+
+    print("\n🔹 Transcription batchée de 6 segments de 5 s")
+    engine = get_engine()
+    results = engine.transcribe_video_segments_batch(video_path, segments)
+
+    # Tolérance sur l'alignement des mots aux frontières (secondes)
+    tolerance = 0.05
+    errors = 0
+
+    for (start_sec, duration), result in zip(segments, results):
+        end_sec = start_sec + duration
+        print(f"\n   Segment [{start_sec}s - {end_sec}s]: "
+              f"{len(result['segments'])} phrase(s), {len(result['words'])} mot(s)")
+
+        for kind in ("segments", "words"):
+            for start, end, text in result[kind]:
+                if start < start_sec - tolerance or end > end_sec + tolerance:
+                    print(f"      ❌ {kind} hors segment: [{start:.2f}s - {end:.2f}s] {text[:40]}")
+                    errors += 1
+
+        for start, end, text in result["segments"][:2]:
+            print(f"      [{start:.2f}s - {end:.2f}s] {text[:50]}")
+
+    print("\n" + "=" * 50)
+    if errors:
+        print(f"❌ {errors} élément(s) hors de leur segment")
+    else:
+        print("✅ Test terminé!")
+
+    assert errors == 0
+
+
+if __name__ == "__main__":
+    test_batch_transcription()
@@ -48,7 +48,8 @@ def test_full_generation():
     print()
     print("🔹 Génération du Short (5 secondes)...")
     
-    # Générer le short
+    # Générer le short (même segment 0-5 s : extract_short réutilise
+    # la transcription mise en cache par le moteur ci-dessus)
     success = extract_short(
         video_path=video_path,
         start_sec=0,
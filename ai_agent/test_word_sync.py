@@ -60,9 +60,9 @@ def test_word_transcription():
         print("   Debug: Vérifions la méthode transcribe_words...")
         
         # Debug supplémentaire
-        audio = engine.extract_audio(video_path, 0, 5)
-        if audio:
-            print(f"   Audio extrait: {audio}")
+        audio = engine.extract_audio_array(video_path, 0, 5)
+        if audio is not None:
+            print(f"   Audio extrait: {len(audio)} échantillons")
             result = engine.transcribe_words(audio)
             print(f"   Résultat transcribe_words: {result}")
     
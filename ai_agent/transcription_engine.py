@@ -2,51 +2,128 @@
 🎯 MOTEUR DE TRANSCRIPTION ULTRA-PERFORMANT
 ============================================
 
-Ce module utilise faster-whisper avec le modèle large-v3 pour une transcription
+Ce module utilise faster-whisper avec le modèle large-v3-turbo pour une transcription
 de qualité professionnelle, 100% gratuite et offline.
 
 Optimisations incluses:
 1. faster-whisper (CTranslate2) - 4x plus rapide que Whisper standard
-2. Modèle large-v3 - Le plus précis disponible (1.5B paramètres)
+2. Modèle large-v3-turbo - Précision proche de large-v3, décodeur 8x plus léger
 3. VAD (Voice Activity Detection) - Ignore les silences
 4. Beam search optimisé - Meilleure précision
 5. Post-processing intelligent - Correction des erreurs communes
 
+Variables d'environnement:
+- MODEL_SIZE_OVERRIDE : force le modèle du moteur "precise"
+- PRELOAD_MODELS      : charge les moteurs dès l'import (ex: "precise" ou
+                        "fast,precise") pour que la première transcription
+                        ne paie pas le chargement du modèle
+
 Auteur: AI Agent pour Frère Théodore
 """
 
 import os
-import sys
+import re
+import json
+import hashlib
 import tempfile
-import subprocess
 import threading
-from typing import List, Tuple, Optional
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+from typing import Dict, Iterator, List, Tuple, Optional, Union
+
+import numpy as np
+
+# PyAV (dépendance de faster-whisper) : décodage audio sans lancer FFmpeg
+try:
+    import av
+    PYAV_AVAILABLE = True
+except ImportError:
+    PYAV_AVAILABLE = False
 
 # Lock global pour la thread-safety du modèle
 _model_lock = threading.Lock()
 
-# Configuration
-CONDA_ENV = os.path.dirname(sys.executable)
-FFMPEG_PATH = os.path.join(CONDA_ENV, "Library", "bin", "ffmpeg.exe")
-if not os.path.exists(FFMPEG_PATH):
-    FFMPEG_PATH = "ffmpeg"
+# Fréquence d'échantillonnage attendue par Whisper
+SAMPLE_RATE = 16000
+
 
-# Ajouter FFmpeg au PATH
-if os.path.exists(os.path.dirname(FFMPEG_PATH)):
-    os.environ["PATH"] = os.path.dirname(FFMPEG_PATH) + os.pathsep + os.environ.get("PATH", "")
+def _decode_audio_pyav(video_path: str, start_sec: float, duration: float) -> Optional[np.ndarray]:
+    """
+    Décode un segment audio en mémoire avec PyAV (libav dans le processus,
+    sans créer de processus FFmpeg).
+    
+    Returns:
+        Signal mono 16 kHz en float32, ou None si aucun échantillon
+    """
+    n_samples = int(duration * SAMPLE_RATE)
+    resampler = av.AudioResampler(format='s16', layout='mono', rate=SAMPLE_RATE)
+    chunks = []
+    total = 0
+    
+    with av.open(video_path) as container:
+        stream = container.streams.audio[0]
+        # Seek sur l'image clé précédant start_sec (unités de av.time_base)
+        container.seek(int(start_sec * av.time_base))
+        
+        for frame in container.decode(stream):
+            frame_start = frame.time if frame.time is not None else start_sec
+            if frame_start + frame.samples / frame.sample_rate <= start_sec:
+                continue
+            
+            for resampled in resampler.resample(frame):
+                data = resampled.to_ndarray().reshape(-1)
+                if not chunks and frame_start < start_sec:
+                    # Ignorer le début de la première trame (avant start_sec)
+                    data = data[int((start_sec - frame_start) * SAMPLE_RATE):]
+                chunks.append(data)
+                total += len(data)
+            
+            if total >= n_samples:
+                break
+    
+    if not chunks:
+        return None
+    
+    return np.concatenate(chunks)[:n_samples].astype(np.float32) / 32768.0
 
 # ============================================================
 # DÉTECTION AUTOMATIQUE DU GPU
 # ============================================================
 
+# En dessous de cette VRAM (en GB), le modèle est chargé en int8_float16
+LOW_VRAM_GB = 8
+
+# Types de calcul CPU par ordre de préférence (int8 : kernels MKL/oneDNN)
+CPU_COMPUTE_TYPES = ("int8", "int8_float32", "float32")
+
+def cpu_compute_type() -> str:
+    """
+    Choisit le type de calcul CPU le plus rapide supporté par CTranslate2.
+    
+    Returns:
+        str: "int8" si disponible, sinon "int8_float32", sinon "float32"
+    """
+    try:
+        import ctranslate2
+        supported = ctranslate2.get_supported_compute_types("cpu")
+        for compute_type in CPU_COMPUTE_TYPES:
+            if compute_type in supported:
+                return compute_type
+    except Exception:
+        pass
+    return "int8"
+
 def detect_device():
     """
     Détecte automatiquement si un GPU NVIDIA avec CUDA est disponible.
     
     Returns:
         tuple: (device, compute_type)
-            - ("cuda", "float16") si GPU NVIDIA disponible
-            - ("cpu", "int8") sinon
+            - ("cuda", "float16") si GPU NVIDIA avec assez de VRAM
+            - ("cuda", "int8_float16") si GPU avec moins de LOW_VRAM_GB
+            - ("cpu", cpu_compute_type()) sinon (int8 si supporté)
     """
     try:
         import torch
@@ -55,6 +132,9 @@ def detect_device():
             gpu_memory = torch.cuda.get_device_properties(0).total_memory / (1024**3)
             print(f"🎮 GPU NVIDIA détecté : {gpu_name} ({gpu_memory:.1f} GB)")
             print(f"⚡ Mode CUDA activé - Transcription ultra-rapide!")
+            if gpu_memory < LOW_VRAM_GB:
+                # Poids int8, calculs float16 : ~2x moins de VRAM
+                return "cuda", "int8_float16"
             return "cuda", "float16"
     except ImportError:
         pass
@@ -70,7 +150,7 @@ def detect_device():
         pass
     
     print("💻 Pas de GPU CUDA détecté - Utilisation du CPU")
-    return "cpu", "int8"
+    return "cpu", cpu_compute_type()
 
 # Détection automatique au démarrage
 DEVICE, COMPUTE_TYPE = detect_device()
@@ -84,12 +164,14 @@ DEVICE, COMPUTE_TYPE = detect_device()
 # - base    : 74M params, rapide mais erreurs fréquentes  
 # - small   : 244M params, bon compromis
 # - medium  : 769M params, très bon
-# - large-v3: 1.5B params, MEILLEURE PRÉCISION (recommandé)
+# - large-v3: 1.5B params, meilleure précision mais lent
+# - large-v3-turbo: 809M params, précision proche de large-v3, bien plus rapide (recommandé)
 
-MODEL_SIZE = "large-v3"  # Le plus précis disponible
+# MODEL_SIZE_OVERRIDE permet de forcer un autre modèle (comparaisons A/B)
+MODEL_SIZE = os.environ.get("MODEL_SIZE_OVERRIDE", "large-v3-turbo")
 
-# Options de transcription optimisées
-TRANSCRIPTION_OPTIONS = {
+# Options de transcription optimisées (modèles précis)
+TRANSCRIPTION_OPTIONS_PRECISE = {
     "language": "fr",           # Français
     "task": "transcribe",       # Transcription (pas traduction)
     "beam_size": 5,             # Beam search pour meilleure précision
@@ -110,6 +192,67 @@ TRANSCRIPTION_OPTIONS = {
     }
 }
 
+# Modèles rapides : décodage glouton (beam_size=1), ~5x moins de travail décodeur
+FAST_MODEL_SIZES = ("tiny", "base", "small")
+TRANSCRIPTION_OPTIONS_FAST = {
+    **TRANSCRIPTION_OPTIONS_PRECISE,
+    "beam_size": 1,
+    "best_of": 1,
+    "temperature": 0.0,
+}
+
+# Nombre de segments vidéo dont la transcription est gardée en mémoire
+# (évite de re-transcrire un segment déjà traité, ex: mots puis phrases)
+TRANSCRIPTION_CACHE_SIZE = 32
+
+# Transcription batchée de plusieurs segments (BatchedInferencePipeline)
+BATCH_SIZE = 8              # Fenêtres de 30 s encodées ensemble
+BATCH_SILENCE_GAP = 2.0     # Silence inséré entre deux segments (secondes)
+
+# Audio court (après suppression des silences) : beam search réduit
+SHORT_SPEECH_SECONDS = 10.0
+SHORT_SPEECH_BEAM_SIZE = 3
+
+# Extraction audio en parallèle de la transcription
+EXTRACT_WORKERS = 8         # Extractions simultanées au maximum
+EXTRACT_PREFETCH = 4        # Segments extraits d'avance (borne la mémoire)
+
+# Cache disque des transcriptions, indexé par l'empreinte de l'audio
+# (TRANSCRIPTION_CACHE=0 pour le désactiver)
+TRANSCRIPT_DISK_CACHE = os.environ.get("TRANSCRIPTION_CACHE", "1") != "0"
+TRANSCRIPT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models_cache", "transcripts")
+
+
+def _read_transcript_cache(path: str) -> Optional[List[tuple]]:
+    """Relit une transcription du cache disque (None si absente ou illisible)."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return [(start, end, text, [tuple(w) for w in words]) for start, end, text, words in data]
+
+
+def _write_transcript_cache(path: str, raw_segments: List[tuple]):
+    """Écrit une transcription dans le cache disque (écriture atomique)."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Fichier temporaire unique (plusieurs threads peuvent écrire la
+        # même clé en même temps) dans le même dossier : os.replace atomique
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(raw_segments, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+    except OSError as e:
+        print(f"⚠️ Cache transcription non écrit: {e}")
+
 # ============================================================
 # DICTIONNAIRE DE CORRECTIONS
 # ============================================================
@@ -150,6 +293,24 @@ CORRECTIONS = {
     "aujourd'hui": "aujourd'hui",
 }
 
+# Toutes les corrections en une seule expression régulière (une passe sur le
+# texte au lieu d'un str.replace par entrée) ; les clés les plus longues
+# passent en premier pour que "jésus christ" l'emporte sur "jésus"
+_CORR_MAP = {wrong.lower(): correct for wrong, correct in CORRECTIONS.items()}
+_CORR_RE = re.compile(
+    r'\b(' + '|'.join(re.escape(k) for k in sorted(_CORR_MAP, key=len, reverse=True)) + r')\b',
+    re.IGNORECASE
+)
+
+
+def _replace_correction(match) -> str:
+    """Correction d'une occurrence ; une majuscule initiale est conservée."""
+    found = match.group(0)
+    correct = _CORR_MAP[found.lower()]
+    if found[0].isupper():
+        return correct[0].upper() + correct[1:]
+    return correct
+
 # ============================================================
 # CLASSE PRINCIPALE
 # ============================================================
@@ -164,10 +325,19 @@ class TranscriptionEngine:
         Initialise le moteur de transcription.
         
         Args:
-            model_size: Taille du modèle (tiny, base, small, medium, large-v3)
+            model_size: Taille du modèle (tiny, base, small, medium, large-v3, large-v3-turbo)
         """
         self.model_size = model_size
         self.model = None
+        if model_size in FAST_MODEL_SIZES:
+            self.options = TRANSCRIPTION_OPTIONS_FAST
+        else:
+            self.options = TRANSCRIPTION_OPTIONS_PRECISE
+        self.batched = None
+        self._vad = None
+        # Cache LRU : (video_path, start_sec, duration) -> (segments, avec_mots)
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
         self._load_model()
     
     def _load_model(self):
@@ -178,15 +348,34 @@ class TranscriptionEngine:
             print(f"🎤 Chargement du modèle {self.model_size}...")
             print(f"   (Première utilisation: téléchargement ~3GB)")
             
+            # Note: CTranslate2 n'expose pas de capture CUDA Graph pour Whisper
+            # (aucune option de WhisperModel) ; le décodage pas à pas reste
+            # piloté par le CPU. Les gains GPU passent par compute_type.
             self.model = WhisperModel(
                 self.model_size,
                 device=DEVICE,
                 compute_type=COMPUTE_TYPE,
+                # Sur CPU, tous les cœurs pour les kernels int8 (0 = défaut CTranslate2)
+                cpu_threads=(os.cpu_count() or 0) if DEVICE == "cpu" else 0,
                 download_root=os.path.join(os.path.dirname(__file__), "models_cache")
             )
             
             print(f"✅ Modèle {self.model_size} chargé!")
             
+            try:
+                from faster_whisper import BatchedInferencePipeline
+                self.batched = BatchedInferencePipeline(model=self.model)
+            except ImportError:
+                # faster-whisper < 1.1 : pas de transcription batchée
+                self.batched = None
+            
+            try:
+                # Silero VAD fourni par faster-whisper, exécuté hors du verrou modèle
+                from faster_whisper.vad import VadOptions, get_speech_timestamps
+                self._vad = (VadOptions, get_speech_timestamps)
+            except ImportError:
+                self._vad = None
+            
         except ImportError:
             print("❌ faster-whisper non installé. Utilisation de whisper standard.")
             self.model = None
@@ -194,9 +383,13 @@ class TranscriptionEngine:
             print(f"❌ Erreur chargement modèle: {e}")
             self.model = None
     
-    def extract_audio(self, video_path: str, start_sec: float, duration: float) -> Optional[str]:
+    def extract_audio_array(self, video_path: str, start_sec: float, duration: float) -> Optional[np.ndarray]:
         """
-        Extrait l'audio d'un segment vidéo.
+        Extrait l'audio d'un segment vidéo directement en mémoire.
+        
+        Décodage avec PyAV à partir de start_sec (seek) ; en cas d'échec,
+        decode_audio de faster-whisper sur tout le fichier. Pas de processus
+        FFmpeg ni de fichier WAV temporaire.
         
         Args:
             video_path: Chemin de la vidéo
@@ -204,35 +397,45 @@ class TranscriptionEngine:
             duration: Durée en secondes
         
         Returns:
-            Chemin du fichier audio temporaire
-        """
-        # Créer un fichier temporaire avec un nom unique
-        import uuid
-        temp_dir = tempfile.gettempdir()
-        temp_audio_path = os.path.join(temp_dir, f"audio_segment_{uuid.uuid4().hex}.wav")
-        
-        cmd = [
-            FFMPEG_PATH,
-            '-y',
-            '-ss', str(start_sec),
-            '-i', video_path,
-            '-t', str(duration),
-            '-vn',
-            '-acodec', 'pcm_s16le',
-            '-ar', '16000',
-            '-ac', '1',
-            temp_audio_path
-        ]
+            Signal mono 16 kHz en float32 (format attendu par faster-whisper)
+        """
+        if PYAV_AVAILABLE:
+            try:
+                audio = _decode_audio_pyav(video_path, start_sec, duration)
+                if audio is not None:
+                    return audio
+            except Exception as e:
+                print(f"⚠️ PyAV: {e} - repli sur decode_audio")
         
+        # Repli : décodage complet par faster-whisper (PyAV), puis découpe
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
-            if result.returncode == 0 and os.path.exists(temp_audio_path):
-                return temp_audio_path
+            from faster_whisper.audio import decode_audio
+            audio = decode_audio(video_path, sampling_rate=SAMPLE_RATE)
+            audio = audio[int(start_sec * SAMPLE_RATE):int((start_sec + duration) * SAMPLE_RATE)]
+            if len(audio):
+                return audio
         except Exception as e:
             print(f"⚠️ Erreur extraction audio: {e}")
         
         return None
     
+    def extract_audio_batch(self, video_path: str, segments: List[Tuple[float, float]]) -> List[Optional[np.ndarray]]:
+        """
+        Extrait l'audio de plusieurs segments en parallèle.
+        
+        Args:
+            video_path: Chemin de la vidéo
+            segments: Liste de (start_sec, duration)
+        
+        Returns:
+            Un signal 16 kHz (ou None en cas d'échec) par segment, dans l'ordre
+        """
+        if not segments:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(EXTRACT_WORKERS, len(segments))) as pool:
+            return list(pool.map(lambda seg: self.extract_audio_array(video_path, *seg), segments))
+    
     def apply_corrections(self, text: str) -> str:
         """
         Applique les corrections au texte transcrit.
@@ -243,93 +446,261 @@ class TranscriptionEngine:
         Returns:
             Texte corrigé
         """
-        result = text.lower()
+        # Une seule passe, la casse d'origine (noms propres, sigles) est conservée
+        return _CORR_RE.sub(_replace_correction, text.strip())
+    
+    def _transcribe_audio(self, audio: Union[str, np.ndarray], with_words: bool = True) -> Optional[List[tuple]]:
+        """
+        Passage unique de Whisper sur un audio.
         
-        # Appliquer les corrections
-        for wrong, correct in CORRECTIONS.items():
-            result = result.replace(wrong.lower(), correct)
+        Args:
+            audio: Chemin du fichier audio ou signal 16 kHz (np.ndarray)
+            with_words: Si True, calcule aussi les timestamps par mot
         
-        # Capitaliser la première lettre de chaque phrase
-        sentences = result.split('. ')
-        sentences = [s.capitalize() if s else s for s in sentences]
-        result = '. '.join(sentences)
+        Returns:
+            Liste de (start, end, text_corrigé, [(start, end, word), ...]),
+            ou None en cas d'erreur
+        """
+        if self.model is None:
+            return None
         
-        # Capitaliser après "?"  et "!"
-        for punct in ['? ', '! ']:
-            parts = result.split(punct)
-            parts = [p.capitalize() if p else p for p in parts]
-            result = punct.join(parts)
+        # Cache disque : un audio identique n'est jamais transcrit deux fois
+        # (un résultat avec les mots sert aussi aux demandes par phrase).
+        # Il garde le texte brut de Whisper : les corrections sont appliquées
+        # à la lecture, une modification de CORRECTIONS vaut donc aussi
+        # pour les transcriptions déjà en cache
+        cache_paths = None
+        results = None
+        if TRANSCRIPT_DISK_CACHE and isinstance(audio, np.ndarray):
+            cache_paths = self._disk_cache_paths(audio)
+            candidates = [cache_paths[True]] if with_words else [cache_paths[True], cache_paths[False]]
+            for path in candidates:
+                results = _read_transcript_cache(path)
+                if results is not None:
+                    break
+        
+        if results is None:
+            try:
+                results = list(self._iter_audio(audio, with_words=with_words))
+            except Exception as e:
+                print(f"❌ Erreur transcription: {e}")
+                return None
+            
+            if cache_paths:
+                _write_transcript_cache(cache_paths[with_words], results)
         
-        return result.strip()
+        return [(start, end, self.apply_corrections(text), words) for start, end, text, words in results]
     
-    def transcribe(self, audio_path: str) -> List[Tuple[float, float, str]]:
+    def _iter_audio(self, audio: Union[str, np.ndarray], with_words: bool = True) -> Iterator[tuple]:
         """
-        Transcrit un fichier audio.
+        Transcrit un audio en produisant les segments au fil du décodage.
+        
+        Seul l'appel à model.transcribe (préparation des features) est fait
+        sous le verrou : le décodage, piloté par l'itération, peut ensuite
+        se faire en parallèle d'autres threads (CTranslate2 est thread-safe).
+        
+        Yields:
+            (start, end, text_brut, [(start, end, word), ...])
+        """
+        options = self.options
+        if not with_words:
+            # Pas d'alignement mot par mot : seul le texte des phrases est utilisé
+            options = {**self.options, "word_timestamps": False}
+        
+        # VAD avant de prendre le verrou : seuls les passages parlés sont
+        # envoyés au modèle, les timestamps sont ensuite ramenés à l'original
+        to_original = None
+        if isinstance(audio, np.ndarray) and options.get("vad_filter") and self._vad is not None:
+            audio, to_original = self._strip_silence(audio, options.get("vad_parameters") or {})
+            options = {**options, "vad_filter": False}
+            
+            if len(audio) < SHORT_SPEECH_SECONDS * SAMPLE_RATE and options["beam_size"] > SHORT_SPEECH_BEAM_SIZE:
+                options = {**options, "beam_size": SHORT_SPEECH_BEAM_SIZE}
+        
+        if to_original is not None and not len(audio):
+            return
+        
+        # Utiliser un lock pour éviter les problèmes de threading
+        with _model_lock:
+            segments, info = self.model.transcribe(audio, **options)
+        
+        for segment in segments:
+            words = []
+            # Récupérer les mots avec leurs timestamps
+            if with_words and getattr(segment, 'words', None):
+                for word_info in segment.words:
+                    word = word_info.word.strip()
+                    if word:
+                        words.append((word_info.start, word_info.end, word))
+            
+            text = segment.text
+            if to_original is None:
+                yield (segment.start, segment.end, text, words)
+            else:
+                yield (to_original(segment.start), to_original(segment.end, True), text,
+                       [(to_original(w_start), to_original(w_end, True), word) for w_start, w_end, word in words])
+    
+    def _strip_silence(self, audio: np.ndarray, vad_parameters: dict):
+        """
+        Ne garde que les passages parlés de l'audio (Silero VAD).
         
         Args:
-            audio_path: Chemin du fichier audio
+            audio: Signal 16 kHz
+            vad_parameters: Paramètres VadOptions (ex: min_silence_duration_ms)
         
         Returns:
-            Liste de (start, end, text) pour chaque segment
+            (audio_parole, to_original) où to_original(t, is_end=False)
+            convertit un temps de audio_parole en temps de l'audio d'origine
         """
-        if self.model is None:
-            return []
+        VadOptions, get_speech_timestamps = self._vad
+        chunks = get_speech_timestamps(audio, VadOptions(**vad_parameters))
         
-        try:
-            # Utiliser un lock pour éviter les problèmes de threading
-            with _model_lock:
-                segments, info = self.model.transcribe(
-                    audio_path,
-                    **TRANSCRIPTION_OPTIONS
-                )
-                
-                results = []
-                for segment in segments:
-                    text = self.apply_corrections(segment.text)
-                    if text.strip():
-                        results.append((segment.start, segment.end, text))
-                
-                return results
-            
-        except Exception as e:
-            print(f"❌ Erreur transcription: {e}")
-            return []
+        # Table de correspondance, en échantillons : début de chaque passage
+        # dans l'audio concaténé et dans l'audio d'origine
+        speech_starts = []
+        original_starts = []
+        position = 0
+        for chunk in chunks:
+            speech_starts.append(position)
+            original_starts.append(chunk["start"])
+            position += chunk["end"] - chunk["start"]
+        
+        def to_original(t, is_end=False):
+            sample = t * SAMPLE_RATE
+            # Une fin pile sur une frontière appartient au passage précédent
+            i = (bisect_left if is_end else bisect_right)(speech_starts, sample) - 1
+            i = max(i, 0)
+            return (original_starts[i] + sample - speech_starts[i]) / SAMPLE_RATE
+        
+        if not chunks:
+            return audio[:0], to_original
+        
+        speech = np.concatenate([audio[chunk["start"]:chunk["end"]] for chunk in chunks])
+        return speech, to_original
+    
+    def _disk_cache_paths(self, audio: np.ndarray) -> Dict[bool, str]:
+        """
+        Chemins du cache disque pour cet audio, ce modèle et ces options
+        (beam size, VAD... : les modifier invalide le cache).
+        
+        Returns:
+            {True: chemin avec mots, False: chemin phrases seules}
+        """
+        digest = hashlib.blake2b(audio.tobytes(), digest_size=16)
+        digest.update(self.model_size.encode())
+        digest.update(json.dumps(self.options, sort_keys=True, default=str).encode())
+        
+        paths = {}
+        for with_words in (True, False):
+            variant = digest.copy()
+            variant.update(b"words" if with_words else b"phrases")
+            paths[with_words] = os.path.join(TRANSCRIPT_CACHE_DIR, variant.hexdigest() + ".json")
+        return paths
     
-    def transcribe_words(self, audio_path: str) -> List[Tuple[float, float, str]]:
+    @staticmethod
+    def _phrases(raw_segments: List[tuple]) -> List[Tuple[float, float, str]]:
+        """Vue par phrase d'un résultat de _transcribe_audio."""
+        return [(start, end, text) for start, end, text, _ in raw_segments if text.strip()]
+    
+    @staticmethod
+    def _words(raw_segments: List[tuple]) -> List[Tuple[float, float, str]]:
+        """Vue mot par mot d'un résultat de _transcribe_audio."""
+        return [word for _, _, _, words in raw_segments for word in words]
+    
+    @classmethod
+    def _views(cls, raw_segments: List[tuple]) -> Dict[str, List[Tuple[float, float, str]]]:
+        """Vues mots + phrases d'un même résultat de _transcribe_audio."""
+        return {"words": cls._words(raw_segments), "segments": cls._phrases(raw_segments)}
+    
+    def transcribe(self, audio: Union[str, np.ndarray]) -> List[Tuple[float, float, str]]:
         """
-        Transcrit un fichier audio et retourne les timestamps MOT PAR MOT.
+        Transcrit un audio.
         
         Args:
-            audio_path: Chemin du fichier audio
+            audio: Chemin du fichier audio ou signal 16 kHz (np.ndarray)
+        
+        Returns:
+            Liste de (start, end, text) pour chaque segment
+        """
+        return self._phrases(self._transcribe_audio(audio, with_words=False) or [])
+    
+    def transcribe_words(self, audio: Union[str, np.ndarray]) -> List[Tuple[float, float, str]]:
+        """
+        Transcrit un audio et retourne les timestamps MOT PAR MOT.
+        
+        Args:
+            audio: Chemin du fichier audio ou signal 16 kHz (np.ndarray)
         
         Returns:
             Liste de (start, end, word) pour chaque mot
         """
-        if self.model is None:
+        return self._words(self._transcribe_audio(audio) or [])
+    
+    def transcribe_full(self, audio: Union[str, np.ndarray]) -> Dict[str, List[Tuple[float, float, str]]]:
+        """
+        Transcrit un audio en une seule passe et retourne à la fois
+        les mots et les phrases (faster-whisper fournit les deux).
+        
+        Args:
+            audio: Chemin du fichier audio ou signal 16 kHz (np.ndarray)
+        
+        Returns:
+            {"words": [(start, end, word), ...], "segments": [(start, end, text), ...]}
+        """
+        return self._views(self._transcribe_audio(audio) or [])
+    
+    def transcribe_both(self, audio: Union[str, np.ndarray]) -> Tuple[List[Tuple[float, float, str]], List[Tuple[float, float, str]]]:
+        """
+        Comme transcribe_full, sous forme de tuple (phrases, mots).
+        
+        Args:
+            audio: Chemin du fichier audio ou signal 16 kHz (np.ndarray)
+        
+        Returns:
+            (phrases, mots) issus du même passage Whisper
+        """
+        views = self.transcribe_full(audio)
+        return views["segments"], views["words"]
+    
+    def _transcribe_once(self, video_path: str, start_sec: float, duration: float,
+                         with_words: bool = True, audio: Optional[np.ndarray] = None) -> List[tuple]:
+        """
+        Transcrit un segment vidéo une seule fois et garde le résultat en cache.
+        
+        Un résultat calculé avec les mots sert aussi aux demandes par phrase ;
+        l'inverse déclenche une nouvelle transcription.
+        
+        Args:
+            audio: Audio du segment déjà extrait (sinon extrait ici)
+        
+        Returns:
+            Liste de (start_relative, end_relative, text, words)
+        """
+        key = (os.path.abspath(video_path), float(start_sec), float(duration))
+        
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None and (cached[1] or not with_words):
+                self._cache.move_to_end(key)
+                return cached[0]
+        
+        # Extraire l'audio (en mémoire)
+        if audio is None:
+            audio = self.extract_audio_array(video_path, start_sec, duration)
+        if audio is None:
             return []
         
-        try:
-            # Utiliser un lock pour éviter les problèmes de threading
-            with _model_lock:
-                segments, info = self.model.transcribe(
-                    audio_path,
-                    **TRANSCRIPTION_OPTIONS
-                )
-                
-                words = []
-                for segment in segments:
-                    # Récupérer les mots avec leurs timestamps
-                    if hasattr(segment, 'words') and segment.words:
-                        for word_info in segment.words:
-                            word = word_info.word.strip()
-                            if word:
-                                words.append((word_info.start, word_info.end, word))
-                
-                return words
-            
-        except Exception as e:
-            print(f"❌ Erreur transcription mots: {e}")
+        raw = self._transcribe_audio(audio, with_words=with_words)
+        if raw is None:
             return []
+        
+        with self._cache_lock:
+            self._cache[key] = (raw, with_words)
+            self._cache.move_to_end(key)
+            while len(self._cache) > TRANSCRIPTION_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        
+        return raw
     
     def transcribe_video_segment(self, video_path: str, start_sec: float, duration: float) -> List[Tuple[float, float, str]]:
         """
@@ -343,20 +714,7 @@ class TranscriptionEngine:
         Returns:
             Liste de (start_relative, end_relative, text)
         """
-        # Extraire l'audio
-        audio_path = self.extract_audio(video_path, start_sec, duration)
-        if not audio_path:
-            return []
-        
-        try:
-            # Transcrire
-            return self.transcribe(audio_path)
-        finally:
-            # Nettoyer
-            try:
-                os.unlink(audio_path)
-            except:
-                pass
+        return self._phrases(self._transcribe_once(video_path, start_sec, duration, with_words=False))
     
     def transcribe_video_segment_words(self, video_path: str, start_sec: float, duration: float) -> List[Tuple[float, float, str]]:
         """
@@ -370,20 +728,171 @@ class TranscriptionEngine:
         Returns:
             Liste de (start_relative, end_relative, word) pour chaque mot
         """
-        # Extraire l'audio
-        audio_path = self.extract_audio(video_path, start_sec, duration)
-        if not audio_path:
+        return self._words(self._transcribe_once(video_path, start_sec, duration))
+    
+    def transcribe_video_segment_full(self, video_path: str, start_sec: float, duration: float) -> Dict[str, List[Tuple[float, float, str]]]:
+        """
+        Transcrit un segment d'une vidéo en une seule passe (mots + phrases).
+        
+        Args:
+            video_path: Chemin de la vidéo
+            start_sec: Début en secondes
+            duration: Durée en secondes
+        
+        Returns:
+            {"words": [...], "segments": [...]} avec des timestamps relatifs
+        """
+        raw = self._transcribe_once(video_path, start_sec, duration)
+        return self._views(raw)
+    
+    def iter_video_segments(self, video_path: str, segments: List[Tuple[float, float]],
+                            with_words: bool = True) -> Iterator[Dict[str, List[Tuple[float, float, str]]]]:
+        """
+        Transcrit une suite de segments en extrayant l'audio des suivants
+        pendant la transcription du segment courant.
+        
+        Args:
+            video_path: Chemin de la vidéo
+            segments: Liste de (start_sec, duration)
+            with_words: Si False, pas de timestamps par mot (plus rapide)
+        
+        Yields:
+            {"words": [...], "segments": [...]} par segment, dans l'ordre,
+            avec des timestamps relatifs au segment
+        """
+        if not segments:
+            return
+        
+        pending = deque()
+        remaining = iter(segments)
+        
+        with ThreadPoolExecutor(max_workers=min(EXTRACT_WORKERS, len(segments))) as pool:
+            def submit_next():
+                segment = next(remaining, None)
+                if segment is not None:
+                    future = pool.submit(self.extract_audio_array, video_path, *segment)
+                    pending.append((segment, future))
+            
+            for _ in range(EXTRACT_PREFETCH):
+                submit_next()
+            
+            while pending:
+                (start_sec, duration), future = pending.popleft()
+                submit_next()
+                
+                audio = future.result()
+                if audio is None:
+                    raw = []
+                else:
+                    raw = self._transcribe_once(video_path, start_sec, duration,
+                                                with_words=with_words, audio=audio)
+                yield self._views(raw)
+    
+    def transcribe_video_segments_batch(self, video_path: str, segments: List[Tuple[float, float]],
+                                        batch_size: int = BATCH_SIZE) -> List[Dict[str, List[Tuple[float, float, str]]]]:
+        """
+        Transcrit plusieurs segments d'une même vidéo en un seul appel batché.
+        
+        Les audios des segments sont concaténés (séparés par BATCH_SILENCE_GAP
+        secondes de silence) puis transcrits par BatchedInferencePipeline :
+        le coût de l'encodeur est partagé entre les segments.
+        
+        Args:
+            video_path: Chemin de la vidéo
+            segments: Liste de (start_sec, duration)
+            batch_size: Nombre de fenêtres de 30 s traitées ensemble
+        
+        Returns:
+            Un {"words": [...], "segments": [...]} par segment demandé,
+            avec des timestamps absolus (position dans la vidéo)
+        """
+        if not segments:
             return []
         
+        if self.batched is None:
+            # Pas de pipeline batchée : un passage par segment
+            results = []
+            for start_sec, duration in segments:
+                full = self.transcribe_video_segment_full(video_path, start_sec, duration)
+                results.append({
+                    key: [(start + start_sec, end + start_sec, text) for start, end, text in items]
+                    for key, items in full.items()
+                })
+            return results
+        
+        # Extraction des audios en parallèle (libav libère le GIL)
+        audios = self.extract_audio_batch(video_path, segments)
+        
+        # Concaténation : offsets[i] / ends[i] = début / fin (s) de l'audio
+        # du segment i dans l'audio batché
+        gap = np.zeros(int(BATCH_SILENCE_GAP * SAMPLE_RATE), dtype=np.float32)
+        pieces = []
+        offsets = []
+        ends = []
+        position = 0
+        for audio in audios:
+            offsets.append(position / SAMPLE_RATE)
+            if audio is not None:
+                pieces.append(audio)
+                position += len(audio)
+            ends.append(position / SAMPLE_RATE)
+            pieces.append(gap)
+            position += len(gap)
+        
+        results = [{"words": [], "segments": []} for _ in segments]
+        
+        def segment_index(t):
+            """Index du segment demandé qui contient l'instant t (audio batché)."""
+            return max(bisect_right(offsets, t) - 1, 0)
+        
+        def add_phrase(i, start, end, text):
+            """Ajoute une phrase au segment i, bornée à son audio."""
+            text = self.apply_corrections(text)
+            if text.strip():
+                shift = segments[i][0] - offsets[i]
+                results[i]["segments"].append((max(start, offsets[i]) + shift,
+                                               min(end, ends[i]) + shift, text))
+        
         try:
-            # Transcrire mot par mot
-            return self.transcribe_words(audio_path)
-        finally:
-            # Nettoyer
-            try:
-                os.unlink(audio_path)
-            except:
-                pass
+            # without_timestamps=False : sinon un seul segment par fenêtre
+            # de 30 s, qui regroupe la parole de plusieurs segments demandés
+            with _model_lock:
+                batched_segments, info = self.batched.transcribe(
+                    np.concatenate(pieces),
+                    batch_size=batch_size,
+                    without_timestamps=False,
+                    **self.options
+                )
+            
+            for segment in batched_segments:
+                words = [w for w in segment.words or [] if w.word.strip()]
+                
+                if not words:
+                    # Pas de mots : phrase attribuée au segment de son début
+                    add_phrase(segment_index(segment.start), segment.start, segment.end, segment.text)
+                    continue
+                
+                indices = [segment_index(word_info.start) for word_info in words]
+                for word_info, i in zip(words, indices):
+                    shift = segments[i][0] - offsets[i]
+                    results[i]["words"].append((word_info.start + shift, word_info.end + shift,
+                                                word_info.word.strip()))
+                
+                if indices[0] == indices[-1]:
+                    add_phrase(indices[0], segment.start, segment.end, segment.text)
+                    continue
+                
+                # Phrase à cheval sur plusieurs segments demandés : découpée
+                # aux frontières, d'après la position de ses mots
+                for i, group in groupby(zip(words, indices), key=lambda pair: pair[1]):
+                    group = [word_info for word_info, _ in group]
+                    add_phrase(i, group[0].start, group[-1].end,
+                               "".join(word_info.word for word_info in group))
+        
+        except Exception as e:
+            print(f"❌ Erreur transcription batch: {e}")
+        
+        return results
 
 
 # ============================================================
@@ -392,11 +901,14 @@ class TranscriptionEngine:
 
 # Dictionnaire des moteurs (fast et precise)
 _engines = {}
+_engines_lock = threading.Lock()
 
 # Mapping des types de modèles
+# (pas de distil-large-v3 sur CPU : il ne transcrit que l'anglais,
+# large-v3-turbo reste le modèle précis quel que soit le device)
 MODEL_TYPES = {
     "fast": "small",       # Rapide, bonne qualité
-    "precise": "large-v3"  # Meilleure qualité, plus lent
+    "precise": MODEL_SIZE  # Meilleure qualité, plus lent (large-v3-turbo)
 }
 
 def get_engine(model_type: str = "precise") -> TranscriptionEngine:
@@ -404,23 +916,28 @@ def get_engine(model_type: str = "precise") -> TranscriptionEngine:
     Retourne l'instance du moteur de transcription pour le type demandé.
     
     Args:
-        model_type: "fast" pour small, "precise" pour large-v3
+        model_type: "fast" pour small, "precise" pour large-v3-turbo
     
     Returns:
         Instance de TranscriptionEngine
     """
-    global _engines
-    
     # Normaliser le type de modèle
     if model_type not in MODEL_TYPES:
         model_type = "precise"
     
-    if model_type not in _engines:
-        model_size = MODEL_TYPES[model_type]
-        print(f"🎤 Initialisation du moteur {model_type} ({model_size})...")
-        _engines[model_type] = TranscriptionEngine(model_size=model_size)
+    engine = _engines.get(model_type)
+    if engine is None:
+        # Double vérification sous verrou : un seul chargement par modèle,
+        # même si plusieurs threads le demandent en même temps
+        with _engines_lock:
+            engine = _engines.get(model_type)
+            if engine is None:
+                model_size = MODEL_TYPES[model_type]
+                print(f"🎤 Initialisation du moteur {model_type} ({model_size})...")
+                engine = TranscriptionEngine(model_size=model_size)
+                _engines[model_type] = engine
     
-    return _engines[model_type]
+    return engine
 
 
 def transcribe_segment(video_path: str, start_sec: float, duration: float, model_type: str = "precise") -> List[Tuple[float, float, str]]:
@@ -440,6 +957,12 @@ def transcribe_segment(video_path: str, start_sec: float, duration: float, model
     return engine.transcribe_video_segment(video_path, start_sec, duration)
 
 
+# Préchargement optionnel des moteurs dès l'import
+if os.environ.get("PRELOAD_MODELS"):
+    for _model_type in os.environ["PRELOAD_MODELS"].split(","):
+        get_engine(_model_type.strip())
+
+
 # ============================================================
 # TEST
 # ============================================================
@@ -8,9 +8,12 @@ Auteur: Agent IA Copilot
 Date: Décembre 2025
 """
 
+import os
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-from scipy.io import wavfile
+import soundfile as sf
 from scipy import signal
+from scipy.fft import rfft, irfft, rfftfreq
 import matplotlib.pyplot as plt
 from tqdm import tqdm
 import warnings
@@ -32,6 +35,60 @@ except ImportError:
     LIBROSA_AVAILABLE = False
     print("ℹ️  'librosa' non disponible (optionnel).")
 
+# Numba (optionnel) : gate spectral compilé en une seule passe parallèle
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Mémoire max (octets) d'un bloc STFT complexe dans le Spectral Gating :
+# au-delà, le signal est traité par blocs (fichiers de plusieurs heures)
+STFT_BLOCK_BYTES = 256 * 1024**2
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _apply_gate(Zxx, noise_profile, noise_thresh, prop_decrease):
+        """
+        Gate spectral en place : chaque bin sous le seuil de bruit de sa
+        fréquence est atténué de prop_decrease (la phase est conservée).
+        """
+        F, T = Zxx.shape
+        attenuation = 1.0 - prop_decrease
+        for f in prange(F):
+            threshold = noise_profile[f, 0] * (1 + noise_thresh)
+            for t in range(T):
+                if abs(Zxx[f, t]) <= threshold:
+                    Zxx[f, t] = Zxx[f, t] * attenuation
+        return Zxx
+    
+    @njit(fastmath=True, cache=True)
+    def _max_abs(x):
+        """Valeur absolue maximale du signal, en une seule lecture."""
+        peak = 0.0
+        for v in x:
+            a = abs(v)
+            if a > peak:
+                peak = a
+        return peak
+else:
+    def _apply_gate(Zxx, noise_profile, noise_thresh, prop_decrease):
+        """
+        Gate spectral en place : chaque bin sous le seuil de bruit de sa
+        fréquence est atténué de prop_decrease (la phase est conservée).
+        """
+        # Bins sous le seuil de bruit : seuls ceux-ci sont multipliés par
+        # (1 - prop_decrease), les autres restent intacts (pas de tableau de gain)
+        below = np.abs(Zxx) <= (noise_profile * (1 + noise_thresh))
+        # Multiplier le spectre complexe conserve la phase d'origine
+        # (pas d'angle/exp à recalculer), en place pour éviter une copie
+        return np.multiply(Zxx, 1.0 - prop_decrease, out=Zxx, where=below)
+    
+    def _max_abs(x):
+        """Valeur absolue maximale du signal (sans tableau np.abs temporaire)."""
+        return max(x.max(), -x.min()) if len(x) else 0.0
+
 
 class AudioDenoiser:
     """
@@ -51,6 +108,7 @@ class AudioDenoiser:
         self.fs = None  # Fréquence d'échantillonnage
         self.y_original = None  # Signal original
         self.y_clean = None  # Signal nettoyé
+        self.stft_window = signal.windows.hann(2048, sym=False)  # Fenêtre du Spectral Gating
         
     def load_audio(self):
         """
@@ -62,13 +120,17 @@ class AudioDenoiser:
         print("="*60)
         
         try:
-            # Lecture du fichier WAV
-            self.fs, audio_data = wavfile.read(self.input_file)
+            if not os.path.exists(self.input_file):
+                raise FileNotFoundError(self.input_file)
+            
+            # Lecture du fichier WAV (libsndfile convertit le PCM en float32
+            # entre -1.0 et 1.0 en une seule passe)
+            audio_data, self.fs = sf.read(self.input_file, dtype='float32', always_2d=False)
             print(f"✅ Fichier chargé: {self.input_file}")
             print(f"   - Fréquence d'échantillonnage: {self.fs} Hz")
             print(f"   - Durée: {len(audio_data)/self.fs:.2f} secondes")
             print(f"   - Nombre d'échantillons: {len(audio_data)}")
-            print(f"   - Format: {audio_data.dtype}")
+            print(f"   - Format: {sf.info(self.input_file).subtype}")
             
             # Vérification de la fréquence d'échantillonnage
             if self.fs != 48000:
@@ -77,20 +139,15 @@ class AudioDenoiser:
             # Conversion en mono si stéréo
             if len(audio_data.shape) > 1:
                 print(f"   - Conversion stéréo -> mono (moyenne des canaux)")
-                audio_data = np.mean(audio_data, axis=1)
-            
-            # Normalisation entre -1.0 et 1.0
-            if audio_data.dtype == np.int16:
-                self.y_original = audio_data.astype(np.float32) / 32768.0
-            elif audio_data.dtype == np.int32:
-                self.y_original = audio_data.astype(np.float32) / 2147483648.0
+                # Moyenne calculée en float32 (pas de tableau float64 intermédiaire)
+                self.y_original = audio_data.mean(axis=1, dtype=np.float32)
             else:
-                self.y_original = audio_data.astype(np.float32)
+                self.y_original = audio_data
             
             # Normalisation finale
-            max_val = np.max(np.abs(self.y_original))
+            max_val = _max_abs(self.y_original)
             if max_val > 0:
-                self.y_original = self.y_original / max_val
+                self.y_original /= max_val
             
             print(f"✅ Signal normalisé: [{np.min(self.y_original):.3f}, {np.max(self.y_original):.3f}]")
             return True
@@ -115,40 +172,58 @@ class AudioDenoiser:
         print("\n🔧 Application du Spectral Gating (méthode alternative)...")
         
         # Paramètres STFT
-        nperseg = 2048
+        window = self.stft_window
+        nperseg = len(window)
         noverlap = nperseg // 2
+        hop = nperseg - noverlap
+        n = len(self.y_original)
+        overlap_factor = nperseg // hop
         
-        # Calcul de la STFT
-        f, t, Zxx = signal.stft(self.y_original, self.fs, 
-                                nperseg=nperseg, noverlap=noverlap)
+        # Signal centré (nperseg // 2 zéros à gauche) et complété à droite
+        # pour que la dernière frame couvre la fin
+        n_frames = max(1, -(-n // hop) + 1)
+        padded_len = (n_frames - 1) * hop + nperseg
+        padded = np.zeros(padded_len, dtype=self.y_original.dtype)
+        padded[nperseg // 2:nperseg // 2 + n] = self.y_original
         
-        # Estimation du profil de bruit (moyenne sur les premières frames)
-        noise_frames = min(10, Zxx.shape[1] // 10)
-        noise_profile = np.mean(np.abs(Zxx[:, :noise_frames]), axis=1, keepdims=True)
+        # Frames (n_frames, nperseg) : vue sans copie sur le signal
+        frames = np.lib.stride_tricks.sliding_window_view(padded, nperseg)[::hop]
         
-        # Application du gate spectral
-        magnitude = np.abs(Zxx)
-        phase = np.angle(Zxx)
-        
-        # Masque: garde les fréquences au-dessus du seuil de bruit
-        mask = magnitude > (noise_profile * (1 + noise_thresh))
-        
-        # Réduction progressive du bruit
-        magnitude_clean = magnitude * mask + magnitude * (1 - mask) * (1 - prop_decrease)
-        
-        # Reconstruction du signal
-        Zxx_clean = magnitude_clean * np.exp(1j * phase)
-        _, y_reconstructed = signal.istft(Zxx_clean, self.fs, 
-                                          nperseg=nperseg, noverlap=noverlap)
+        # Estimation du profil de bruit (moyenne sur les premières frames)
+        noise_frames = min(10, n_frames // 10)
+        Z_noise = rfft(frames[:noise_frames] * window, axis=1, workers=-1)
+        noise_profile = np.mean(np.abs(Z_noise), axis=0)[:, np.newaxis]
+        
+        # Overlap-add par tranches de hop échantillons : la frame t écrit sa
+        # r-ième tranche dans la tranche t + r de la sortie
+        out = np.zeros((n_frames + overlap_factor - 1, hop))
+        norm = np.zeros_like(out)
+        window_sq = (window ** 2).reshape(overlap_factor, hop)
+        for r in range(overlap_factor):
+            norm[r:r + n_frames] += window_sq[r]
+        
+        # Traitement par blocs de frames (mémoire bornée) : une rfft/irfft
+        # batchée et multithreadée par bloc (pocketfft)
+        frames_per_block = max(1, STFT_BLOCK_BYTES // ((nperseg // 2 + 1) * 16))  # complex128
+        for f0 in range(0, n_frames, frames_per_block):
+            f1 = min(f0 + frames_per_block, n_frames)
+            
+            Zxx = rfft(frames[f0:f1] * window, axis=1, workers=-1)
+            
+            # Application du gate spectral (vue fréquences x temps)
+            _apply_gate(Zxx.T, noise_profile, noise_thresh, prop_decrease)
+            
+            y_frames = irfft(Zxx, n=nperseg, axis=1, workers=-1)
+            y_frames *= window
+            y_frames = y_frames.reshape(f1 - f0, overlap_factor, hop)
+            for r in range(overlap_factor):
+                out[f0 + r:f1 + r] += y_frames[:, r, :]
         
-        # Ajuster la longueur
-        if len(y_reconstructed) > len(self.y_original):
-            y_reconstructed = y_reconstructed[:len(self.y_original)]
-        elif len(y_reconstructed) < len(self.y_original):
-            y_reconstructed = np.pad(y_reconstructed, 
-                                     (0, len(self.y_original) - len(y_reconstructed)))
+        # Normalisation par la somme des fenêtres au carré (synthèse WOLA)
+        np.divide(out, norm, out=out, where=norm > 1e-10)
+        y_clean = out.reshape(-1)[nperseg // 2:nperseg // 2 + n]
         
-        return y_reconstructed
+        return y_clean
     
     def denoise_audio(self, method="auto"):
         """
@@ -200,9 +275,9 @@ class AudioDenoiser:
             print("✅ Spectral Gating appliqué avec succès!")
         
         # Normalisation du signal nettoyé
-        max_val = np.max(np.abs(self.y_clean))
+        max_val = _max_abs(self.y_clean)
         if max_val > 0:
-            self.y_clean = self.y_clean / max_val
+            self.y_clean /= max_val
         
         print(f"   Signal nettoyé: [{np.min(self.y_clean):.3f}, {np.max(self.y_clean):.3f}]")
     
@@ -214,12 +289,13 @@ class AudioDenoiser:
             freqs, magnitude (en dB)
         """
         n = len(signal_data)
-        fft_vals = np.fft.fft(signal_data)
-        fft_magnitude = np.abs(fft_vals[:n//2])
-        freqs = np.fft.fftfreq(n, 1/self.fs)[:n//2]
+        # Signal réel : rfft ne calcule que les fréquences positives
+        # (pocketfft de scipy, multithreadé avec workers=-1)
+        fft_vals = rfft(signal_data, workers=-1)
+        freqs = rfftfreq(n, 1/self.fs)
         
         # Conversion en dB
-        fft_db = 20 * np.log10(fft_magnitude + 1e-10)  # +epsilon pour éviter log(0)
+        fft_db = 20 * np.log10(np.abs(fft_vals) + 1e-10)  # +epsilon pour éviter log(0)
         
         return freqs, fft_db
     
@@ -289,26 +365,37 @@ class AudioDenoiser:
         
         return reduction_db
     
-    def export_audio(self):
+    def _write_clean_audio(self):
+        """
+        Écriture disque du signal nettoyé, sans affichage (peut tourner en
+        arrière-plan sans mélanger sa sortie à celle des autres étapes).
+        """
+        # Sauvegarde en WAV 16-bit : libsndfile convertit le float en
+        # int16 en C, sans tableau temporaire côté Python
+        sf.write(self.output_file, self.y_clean, self.fs, subtype='PCM_16')
+    
+    def export_audio(self, write_future=None):
         """
         C. Exportation: Sauvegarde du signal nettoyé.
         Story 2.2: Fichier audio nettoyé automatiquement.
+        
+        Args:
+            write_future: Écriture déjà lancée en arrière-plan (sinon faite ici)
         """
         print("\n" + "="*60)
         print("💾 ÉTAPE 4: EXPORTATION DU FICHIER NETTOYÉ")
         print("="*60)
         
         try:
-            # Conversion en int16 pour export WAV
-            y_export = (self.y_clean * 32767).astype(np.int16)
-            
-            # Sauvegarde
-            wavfile.write(self.output_file, self.fs, y_export)
+            if write_future is None:
+                self._write_clean_audio()
+            else:
+                write_future.result()
             
             print(f"✅ Fichier exporté avec succès: {self.output_file}")
             print(f"   - Format: WAV 16-bit PCM")
             print(f"   - Fréquence: {self.fs} Hz")
-            print(f"   - Durée: {len(y_export)/self.fs:.2f} secondes")
+            print(f"   - Durée: {len(self.y_clean)/self.fs:.2f} secondes")
             
             return True
             
@@ -333,9 +420,13 @@ class AudioDenoiser:
         # Étape B: Dénoisation IA
         self.denoise_audio(method="auto")
         
-        # Étape C: Validation et Exportation
-        reduction_db = self.validate_and_plot()
-        success = self.export_audio()
+        # Étape C: Validation et Exportation (l'écriture disque se fait
+        # en arrière-plan pendant le calcul des FFT, le compte rendu de
+        # l'étape 4 s'affiche ensuite)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            write_future = executor.submit(self._write_clean_audio)
+            reduction_db = self.validate_and_plot()
+            success = self.export_audio(write_future)
         
         # Résumé final
         print("\n" + "="*70)
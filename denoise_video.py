@@ -12,10 +12,9 @@ Date: Décembre 2025
 import os
 import subprocess
 import numpy as np
-import soundfile as sf
 from pathlib import Path
-import tempfile
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 
 # Import de noisereduce pour la dénoisation
 try:
@@ -25,6 +24,13 @@ except ImportError:
     NOISEREDUCE_AVAILABLE = False
     print("⚠️ noisereduce non disponible")
 
+# PyTorch (déjà requis par extract_vocals.py) : backend GPU de noisereduce
+try:
+    import torch
+    TORCH_CUDA_AVAILABLE = torch.cuda.is_available()
+except ImportError:
+    TORCH_CUDA_AVAILABLE = False
+
 
 def get_ffmpeg_path():
     """Trouve le chemin de ffmpeg."""
@@ -43,6 +49,53 @@ def get_ffmpeg_path():
     return "ffmpeg"  # Espérer que c'est dans le PATH
 
 
+def get_audio_channels(ffmpeg, input_video):
+    """
+    Nombre de canaux de la première piste audio (ffprobe, à côté de ffmpeg).
+    
+    Returns:
+        int, ou None si la détection échoue
+    """
+    ffmpeg_dir, ffmpeg_name = os.path.split(ffmpeg)
+    ffprobe = os.path.join(ffmpeg_dir, ffmpeg_name.replace("ffmpeg", "ffprobe"))
+    try:
+        result = subprocess.run(
+            [ffprobe, "-v", "error", "-select_streams", "a:0",
+             "-show_entries", "stream=channels", "-of", "csv=p=0", input_video],
+            capture_output=True, text=True, timeout=30
+        )
+        return int(result.stdout.strip())
+    except (OSError, ValueError, subprocess.TimeoutExpired):
+        return None
+
+
+def _denoise_gpu(audio, sr):
+    """
+    noisereduce non stationnaire sur GPU (backend torch de noisereduce) :
+    même algorithme et mêmes paramètres que sur CPU, tous les canaux
+    traités en un seul lot.
+    
+    Args:
+        audio: Signal (échantillons,) ou (échantillons, canaux)
+        sr: Fréquence d'échantillonnage
+    
+    Returns:
+        Signal nettoyé de forme (échantillons, canaux)
+    """
+    channels = np.ascontiguousarray(audio.T if audio.ndim > 1 else audio[np.newaxis, :])
+    audio_clean = nr.reduce_noise(
+        y=channels,
+        sr=sr,
+        stationary=False,
+        prop_decrease=0.85,
+        freq_mask_smooth_hz=500,
+        time_mask_smooth_ms=50,
+        use_torch=True,
+        device="cuda"
+    )
+    return np.reshape(audio_clean, channels.shape).T
+
+
 def denoise_video(input_video, output_video=None, extract_vocals=False):
     """
     Débruite l'audio d'une vidéo.
@@ -75,10 +128,12 @@ def denoise_video(input_video, output_video=None, extract_vocals=False):
     
     print(f"📁 Vidéo sortie: {output_video}")
     
-    # Créer un dossier temporaire
-    temp_dir = tempfile.mkdtemp(prefix="video_denoise_")
-    temp_audio = os.path.join(temp_dir, "audio_extracted.wav")
-    temp_audio_clean = os.path.join(temp_dir, "audio_clean.wav")
+    # L'audio transite par des pipes (PCM 16-bit brut) : pas de WAV temporaire
+    sr = 48000
+    
+    # Source mono : FFmpeg extrait un seul canal (pas de canal dupliqué à
+    # débruiter deux fois ni de moyenne à refaire en Python)
+    channels = 1 if get_audio_channels(ffmpeg, input_video) == 1 else 2
     
     try:
         # === ÉTAPE 1: Extraire l'audio de la vidéo ===
@@ -89,56 +144,74 @@ def denoise_video(input_video, output_video=None, extract_vocals=False):
         cmd_extract = [
             ffmpeg, "-i", input_video,
             "-vn",  # Pas de vidéo
-            "-acodec", "pcm_s16le",  # Format WAV 16-bit
-            "-ar", "48000",  # 48kHz
-            "-ac", "2",  # Stéréo
-            "-y",  # Écraser si existe
-            temp_audio
+            "-f", "s16le",  # PCM 16-bit brut
+            "-acodec", "pcm_s16le",
+            "-ar", str(sr),  # 48kHz
+            "-ac", str(channels),  # Mono si la source l'est, sinon stéréo
+            "pipe:1"  # Sortie standard
         ]
         
         print(f"   Extraction en cours...")
-        result = subprocess.run(cmd_extract, capture_output=True, text=True)
+        result = subprocess.run(cmd_extract, capture_output=True)
         
-        if not os.path.exists(temp_audio):
+        if result.returncode != 0 or not result.stdout:
             print(f"❌ Échec de l'extraction audio")
-            print(f"   Erreur: {result.stderr}")
+            print(f"   Erreur: {result.stderr.decode(errors='replace')}")
             return None
         
-        print(f"   ✅ Audio extrait: {os.path.getsize(temp_audio) / 1024 / 1024:.2f} MB")
+        print(f"   ✅ Audio extrait: {len(result.stdout) / 1024 / 1024:.2f} MB")
         
         # === ÉTAPE 2: Charger et débruiter l'audio ===
         print("\n" + "-"*40)
         print("📌 ÉTAPE 2: Débruitage de l'audio")
         print("-"*40)
         
-        # Charger l'audio
-        audio, sr = sf.read(temp_audio)
+        # Charger l'audio (échantillons entrelacés L/R en stéréo)
+        audio = np.frombuffer(result.stdout, dtype=np.int16).astype(np.float32) / 32768.0
+        if channels == 2:
+            audio = audio.reshape(-1, 2)
+        del result
         print(f"   - Fréquence: {sr} Hz")
         print(f"   - Durée: {len(audio)/sr:.2f} secondes")
         print(f"   - Canaux: {audio.shape[1] if len(audio.shape) > 1 else 1}")
         
+        # Débruitage sur GPU si disponible
+        audio_clean = None
+        if NOISEREDUCE_AVAILABLE and TORCH_CUDA_AVAILABLE:
+            print(f"\n   🎮 Application de noisereduce (IA, GPU)...")
+            try:
+                audio_clean = _denoise_gpu(audio, sr)
+                if audio_clean.shape[1] == 1:
+                    # Convertir en stéréo
+                    audio_clean = np.repeat(audio_clean, 2, axis=1)
+            except RuntimeError as e:
+                # Mémoire GPU insuffisante (fichiers très longs), etc.
+                print(f"   ⚠️ Erreur GPU: {e} - repli sur noisereduce")
+                audio_clean = None
+        
+        if audio_clean is not None:
+            print(f"   ✅ Débruitage GPU terminé!")
         # Débruitage avec noisereduce
-        if NOISEREDUCE_AVAILABLE:
+        elif NOISEREDUCE_AVAILABLE:
             print(f"\n   🧠 Application de noisereduce (IA)...")
             
-            # Traiter chaque canal séparément si stéréo
+            # Traiter chaque canal séparément si stéréo (en parallèle :
+            # les FFT de noisereduce relâchent le GIL)
             if len(audio.shape) > 1 and audio.shape[1] == 2:
-                audio_clean_L = nr.reduce_noise(
-                    y=audio[:, 0], 
-                    sr=sr,
-                    stationary=False,
-                    prop_decrease=0.85,
-                    freq_mask_smooth_hz=500,
-                    time_mask_smooth_ms=50
-                )
-                audio_clean_R = nr.reduce_noise(
-                    y=audio[:, 1], 
-                    sr=sr,
-                    stationary=False,
-                    prop_decrease=0.85,
-                    freq_mask_smooth_hz=500,
-                    time_mask_smooth_ms=50
-                )
+                with ThreadPoolExecutor(max_workers=2) as pool:
+                    futures = [
+                        pool.submit(
+                            nr.reduce_noise,
+                            y=audio[:, channel],
+                            sr=sr,
+                            stationary=False,
+                            prop_decrease=0.85,
+                            freq_mask_smooth_hz=500,
+                            time_mask_smooth_ms=50
+                        )
+                        for channel in (0, 1)
+                    ]
+                    audio_clean_L, audio_clean_R = [f.result() for f in futures]
                 audio_clean = np.stack([audio_clean_L, audio_clean_R], axis=1)
             else:
                 # Mono
@@ -163,14 +236,14 @@ def denoise_video(input_video, output_video=None, extract_vocals=False):
             print("   ⚠️ noisereduce non disponible, audio non modifié")
             audio_clean = audio
         
-        # Normalisation
-        max_val = np.max(np.abs(audio_clean))
-        if max_val > 0:
-            audio_clean = audio_clean / max_val * 0.95
-        
-        # Sauvegarder l'audio nettoyé
-        sf.write(temp_audio_clean, audio_clean, sr)
-        print(f"   ✅ Audio nettoyé sauvegardé")
+        # Normalisation (pic à 0.95) et conversion en PCM 16-bit pour FFmpeg
+        # en une seule passe : le gain est appliqué pendant la conversion
+        max_val = max(audio_clean.max(), -audio_clean.min()) if audio_clean.size else 0.0
+        scale = 0.95 * 32767 / max_val if max_val > 0 else 32767
+        pcm_clean = np.empty(audio_clean.shape, dtype=np.int16)
+        np.multiply(audio_clean, scale, out=pcm_clean, casting='unsafe')
+        pcm_channels = pcm_clean.shape[1] if pcm_clean.ndim > 1 else 1
+        print(f"   ✅ Audio nettoyé prêt")
         
         # === ÉTAPE 3: Reconstruire la vidéo ===
         print("\n" + "-"*40)
@@ -180,7 +253,8 @@ def denoise_video(input_video, output_video=None, extract_vocals=False):
         cmd_merge = [
             ffmpeg, 
             "-i", input_video,  # Vidéo originale
-            "-i", temp_audio_clean,  # Audio nettoyé
+            "-f", "s16le", "-ar", str(sr), "-ac", str(pcm_channels),
+            "-i", "pipe:0",  # Audio nettoyé (entrée standard)
             "-c:v", "copy",  # Copier la vidéo sans ré-encoder
             "-c:a", "aac",  # Encoder l'audio en AAC
             "-b:a", "192k",  # Bitrate audio
@@ -192,11 +266,15 @@ def denoise_video(input_video, output_video=None, extract_vocals=False):
         ]
         
         print(f"   Reconstruction en cours...")
-        result = subprocess.run(cmd_merge, capture_output=True, text=True)
+        # Vue octets sur le buffer PCM (pas de copie) : subprocess découpe
+        # l'entrée par offsets en octets, d'où le cast à plat
+        result = subprocess.run(cmd_merge, input=memoryview(pcm_clean).cast("B"),
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
         
-        if not os.path.exists(output_video):
+        if result.returncode != 0 or not os.path.exists(output_video):
             print(f"❌ Échec de la reconstruction")
-            print(f"   Erreur: {result.stderr}")
+            # La fin de stderr suffit (le message d'erreur de ffmpeg)
+            print(f"   Erreur: {result.stderr[-512:].decode(errors='replace')}")
             return None
         
         print(f"   ✅ Vidéo reconstruite!")
@@ -221,13 +299,6 @@ def denoise_video(input_video, output_video=None, extract_vocals=False):
         import traceback
         traceback.print_exc()
         return None
-        
-    finally:
-        # Nettoyer les fichiers temporaires
-        try:
-            shutil.rmtree(temp_dir)
-        except:
-            pass
 
 
 def main():
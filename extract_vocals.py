@@ -8,12 +8,276 @@ Date: Décembre 2025
 """
 
 import os
+import functools
+import importlib.util
+from math import gcd
 import torch
+import torch.nn.functional as F
 import numpy as np
 from scipy.io import wavfile
 import soundfile as sf
 from pathlib import Path
 
+# Découpage de l'inférence Demucs : fenêtres de DEMUCS_SEGMENT secondes
+# (maximum de htdemucs) recouvertes à DEMUCS_OVERLAP, fondu aux jonctions
+DEMUCS_SEGMENT = 7.8
+DEMUCS_OVERLAP = 0.25
+
+# Mix long traité par blocs de DEMUCS_CHUNK_SECONDS (fondu linéaire de
+# DEMUCS_CHUNK_FADE secondes entre deux blocs) : la mémoire ne dépend plus
+# de la durée, seules les sources demandées sont accumulées
+DEMUCS_CHUNK_SECONDS = 60.0
+DEMUCS_CHUNK_FADE = 1.0
+
+# Fenêtres DEMUCS_SEGMENT passées au modèle par lots (occupation GPU)
+DEMUCS_BATCH_SIZE = 4
+
+# FP16 (autocast) seulement à partir de Volta (compute capability 7.x) :
+# avant, pas de Tensor Cores et le FP16 n'accélère pas l'inférence
+FP16_MIN_CAPABILITY = 7
+
+
+@functools.lru_cache(maxsize=None)
+def use_fp16(device):
+    """Indique si l'inférence Demucs doit passer en FP16 sur ce device."""
+    return device == 'cuda' and torch.cuda.get_device_capability()[0] >= FP16_MIN_CAPABILITY
+
+
+@functools.lru_cache(maxsize=2)
+def load_model(name, device, quantize=True):
+    """
+    Charge un modèle Demucs une seule fois par processus (poids lus sur
+    disque, transférés sur le device et compilés au premier appel).
+    
+    Args:
+        name: Nom du modèle pré-entraîné (ex: 'htdemucs')
+        device: 'cuda' ou 'cpu'
+        quantize: Quantification int8 des couches Linear sur CPU
+    """
+    from demucs.pretrained import get_model
+    
+    # Charger le modèle (htdemucs = Hybrid Transformer, meilleure qualité)
+    model = get_model(name)
+    model.eval()
+    model.to(device)
+    if device == 'cuda':
+        # Poids des Conv2d (branche spectrale) en NHWC pour cuDNN
+        model.to(memory_format=torch.channels_last)
+    
+    if device == 'cpu' and quantize:
+        # Quantification dynamique int8 des couches Linear (transformer de
+        # htdemucs) : poids int8, kernels VNNI/fbgemm sur x86
+        try:
+            torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear},
+                                                   dtype=torch.qint8, inplace=True)
+            print("   ⚡ Couches Linear quantifiées en int8 (CPU)")
+        except Exception as e:
+            print(f"   ⚠️ Quantification int8 indisponible: {e}")
+    
+    compile_model(model, device)
+    return model
+
+
+def compile_model(model, device):
+    """
+    torch.compile (TorchInductor/Triton) en mode 'reduce-overhead' : fusion
+    des kernels et capture CUDA Graph. Les fenêtres DEMUCS_SEGMENT ont
+    toutes la même forme, le graphe capturé est rejoué pour chacune.
+    Sans effet sur CPU ou sans Triton (absent des installations Windows
+    standard).
+    """
+    if device == 'cuda' and hasattr(torch, 'compile') and importlib.util.find_spec('triton'):
+        # Compiler le forward des sous-modèles : apply_model a besoin
+        # des attributs du BagOfModels (segment, sources, samplerate)
+        sub_models = getattr(model, 'models', [model])
+        eager_forwards = [sub_model.forward for sub_model in sub_models]
+        try:
+            for sub_model in sub_models:
+                sub_model.forward = torch.compile(sub_model.forward, mode='reduce-overhead')
+                # torch.compile est paresseux : Dynamo/Inductor ne tournent
+                # qu'au premier forward, lancé ici sur un lot nul pour que
+                # leurs erreurs ne surviennent pas en pleine séparation
+                _warmup_forward(sub_model, device)
+            print("   ⚡ Modèle compilé (torch.compile)")
+        except Exception as e:
+            # Retour au forward eager d'origine
+            for sub_model, forward in zip(sub_models, eager_forwards):
+                sub_model.forward = forward
+            print(f"   ⚠️ torch.compile indisponible, exécution sans compilation: {e}")
+
+
+def _window_lengths(sub_model):
+    """
+    Longueurs (en échantillons) d'une fenêtre DEMUCS_SEGMENT et de sa
+    version complétée (valid_length) passée au modèle.
+    """
+    segment = min(DEMUCS_SEGMENT, float(getattr(sub_model, 'segment', DEMUCS_SEGMENT)))
+    segment_len = int(segment * sub_model.samplerate)
+    valid_len = sub_model.valid_length(segment_len) if hasattr(sub_model, 'valid_length') else segment_len
+    return segment_len, valid_len
+
+
+def _warmup_forward(sub_model, device):
+    """
+    Forwards sur un lot nul de la forme utilisée par _apply_batched, dans
+    le même contexte (inference_mode, autocast) que la séparation.
+    """
+    _, valid_len = _window_lengths(sub_model)
+    channels = getattr(sub_model, 'audio_channels', 2)
+    warmup = torch.zeros(DEMUCS_BATCH_SIZE, channels, valid_len, device=device)
+    with torch.inference_mode(), torch.autocast('cuda', dtype=torch.float16,
+                                                enabled=use_fp16(device)):
+        # 1er appel : compilation ; 2e appel : capture du CUDA Graph
+        # (mode 'reduce-overhead'), rejoué ensuite par _apply_batched
+        for _ in range(2):
+            sub_model(warmup)
+    # Les erreurs CUDA asynchrones remontent ici, pas au premier vrai lot
+    torch.cuda.synchronize()
+
+
+def _apply_batched(sub_model, mix, device):
+    """
+    Applique un modèle Demucs simple (pas un BagOfModels) sur des fenêtres
+    recouvrantes traitées par lots, puis les recombine (overlap-add avec
+    poids triangulaires, comme demucs.apply.apply_model).
+    
+    Args:
+        sub_model: Modèle Demucs (HTDemucs, ...)
+        mix: Mix (channels, samples)
+        device: 'cuda' ou 'cpu'
+    
+    Returns:
+        Tenseur (sources, channels, samples) sur le device
+    """
+    channels, length = mix.shape
+    segment_len, valid_len = _window_lengths(sub_model)
+    stride = int((1 - DEMUCS_OVERLAP) * segment_len)
+    pad_left = (valid_len - segment_len) // 2
+    
+    weight = torch.cat([torch.arange(1, segment_len // 2 + 1),
+                        torch.arange(segment_len - segment_len // 2, 0, -1)]).float().to(device)
+    weight /= weight.max()
+    
+    # Mix complété de zéros : la fenêtre (avec sa marge valid_length) qui
+    # commence à offset est padded[:, offset:offset + valid_len]
+    offsets = list(range(0, length, stride))
+    padded = F.pad(mix, (pad_left, offsets[-1] + valid_len - pad_left - length))
+    
+    out = torch.zeros(len(sub_model.sources), channels, length, device=device)
+    sum_weight = torch.zeros(length, device=device)
+    
+    # Entrée de forme et d'adresse fixes (lot complet, même le dernier) :
+    # le graphe compilé / capturé est rejoué sans recompilation
+    input_buf = torch.zeros(DEMUCS_BATCH_SIZE, channels, valid_len, device=device)
+    
+    for b in range(0, len(offsets), DEMUCS_BATCH_SIZE):
+        batch_offsets = offsets[b:b + DEMUCS_BATCH_SIZE]
+        for i, offset in enumerate(batch_offsets):
+            input_buf[i].copy_(padded[:, offset:offset + valid_len])
+        input_buf[len(batch_offsets):].zero_()
+        
+        # Sorties consommées avant l'appel suivant (le CUDA Graph réutilise
+        # ses buffers de sortie)
+        estimates = sub_model(input_buf)[:len(batch_offsets), ..., pad_left:pad_left + segment_len]
+        
+        for offset, estimate in zip(batch_offsets, estimates):
+            n = min(segment_len, length - offset)
+            out[..., offset:offset + n] += estimate[..., :n].float() * weight[:n]
+            sum_weight[offset:offset + n] += weight[:n]
+    
+    return out / sum_weight
+
+
+def separate_stems(model, audio_tensor, stems, device, mono=False, output_device='cpu'):
+    """
+    Sépare un mix avec Demucs bloc par bloc en ne gardant que certaines
+    sources (les autres sont libérées après chaque bloc).
+    
+    Args:
+        model: Modèle Demucs (déjà sur le device)
+        audio_tensor: Mix (channels, samples), au taux model.samplerate
+        stems: Noms des sources à garder (ex: ('vocals', 'drums'))
+        device: 'cuda' ou 'cpu'
+        mono: Moyenne des canaux faite sur le device, avant tout transfert
+        output_device: Device du tenseur renvoyé ('cpu' par défaut ; le
+            device de calcul évite l'aller-retour si la suite y reste)
+    
+    Returns:
+        Tenseur (len(stems), channels, samples) sur output_device
+        (channels = 1 si mono)
+    """
+    indices = [model.sources.index(name) for name in stems]
+    
+    # BagOfModels (htdemucs_ft...) : un poids par (sous-modèle, source) ;
+    # les sous-modèles de poids nul pour les sources demandées sont sautés
+    sub_models = getattr(model, 'models', [model])
+    bag_weights = getattr(model, 'weights', None) or [[1.0] * len(model.sources)] * len(sub_models)
+    channels, length = audio_tensor.shape
+    chunk = int(DEMUCS_CHUNK_SECONDS * model.samplerate)
+    fade = int(DEMUCS_CHUNK_FADE * model.samplerate)
+    stride = chunk - fade
+    
+    # Rampes complémentaires : leur somme vaut 1 sur la zone de recouvrement
+    ramp_up = (torch.arange(fade, dtype=torch.float32, device=output_device) + 0.5) / fade
+    ramp_down = 1 - ramp_up
+    
+    out = torch.zeros(len(stems), 1 if mono else channels, length, device=output_device)
+    n_chunks = max(1, -(-(length - fade) // stride))
+    
+    # Sur GPU, chaque bloc transite par un même buffer en mémoire
+    # verrouillée (pinned) : une copie DMA asynchrone par bloc au lieu de
+    # copies synchrones fenêtre par fenêtre depuis la mémoire paginable
+    staging = None
+    copy_done = None
+    if device == 'cuda':
+        staging = torch.empty(channels * min(chunk, length)).pin_memory()
+        copy_done = torch.cuda.Event()
+    
+    for i, start in enumerate(range(0, length, stride), 1):
+        end = min(start + chunk, length)
+        print(f"   Bloc {i}/{n_chunks}...")
+        
+        mix = audio_tensor[:, start:end]
+        if staging is not None:
+            # Attendre la fin de la copie précédente avant de réécrire
+            # le buffer
+            copy_done.synchronize()
+            host = staging[:mix.numel()].view(channels, end - start)
+            host.copy_(mix)
+            mix = host.to(device, non_blocking=True)
+            copy_done.record()
+        estimate = torch.zeros(len(stems), channels, end - start, device=device)
+        totals = torch.zeros(len(stems), 1, 1, device=device)
+        
+        with torch.inference_mode(), torch.autocast('cuda', dtype=torch.float16,
+                                                    enabled=use_fp16(device)):
+            for sub_model, weights in zip(sub_models, bag_weights):
+                source_weights = torch.tensor([float(weights[idx]) for idx in indices],
+                                              device=device).view(-1, 1, 1)
+                if not source_weights.any():
+                    continue
+                sub_estimate = _apply_batched(sub_model, mix, device)[indices]
+                estimate += source_weights * sub_estimate
+                totals += source_weights
+        
+        estimate = estimate / totals
+        if mono:
+            estimate = estimate.mean(1, keepdim=True)
+        estimate = estimate.to(output_device)
+        
+        weight = torch.ones(end - start, device=output_device)
+        if start > 0:
+            weight[:fade] = ramp_up
+        if end < length:
+            weight[-fade:] = ramp_down
+        out[:, :, start:end] += estimate * weight
+        
+        if end == length:
+            break
+    
+    return out
+
+
 def extract_vocals(input_file="audio_bruit_test.wav"):
     """
     Extrait les voix d'un fichier audio en utilisant Demucs.
@@ -37,19 +301,14 @@ def extract_vocals(input_file="audio_bruit_test.wav"):
     
     try:
         # Import de Demucs
-        from demucs.pretrained import get_model
         from demucs.apply import apply_model
         
-        print("\n⏳ Chargement du modèle IA htdemucs...")
-        
-        # Charger le modèle (htdemucs = Hybrid Transformer, meilleure qualité)
-        model = get_model('htdemucs')
-        model.eval()
-        
         # Utiliser GPU si disponible
         device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        
+        print("\n⏳ Chargement du modèle IA htdemucs...")
         print(f"   Appareil: {device.upper()}")
-        model.to(device)
+        model = load_model('htdemucs', device)
         
         # Charger l'audio avec soundfile
         print("\n📂 Chargement de l'audio...")
@@ -71,24 +330,29 @@ def extract_vocals(input_file="audio_bruit_test.wav"):
         if sr != target_sr:
             print(f"   Rééchantillonnage: {sr} Hz -> {target_sr} Hz")
             from scipy import signal as sig
-            num_samples = int(len(audio) * target_sr / sr)
-            audio = sig.resample(audio, num_samples)
+            # Polyphase (filtre FIR) plutôt qu'une FFT sur tout le signal
+            g = gcd(sr, target_sr)
+            audio = sig.resample_poly(audio, target_sr // g, sr // g, axis=0)
             sr = target_sr
         
         # Convertir en tensor PyTorch: (batch, channels, samples)
-        audio_tensor = torch.tensor(audio.T, dtype=torch.float32).unsqueeze(0)
-        audio_tensor = audio_tensor.to(device)
+        # (reste en RAM : apply_model envoie chaque fenêtre sur le device)
+        audio_tensor = torch.from_numpy(np.ascontiguousarray(audio.T, dtype=np.float32)).unsqueeze(0)
         
         print("\n⏳ Séparation en cours (cela peut prendre quelques minutes)...")
         print("   Le modèle sépare: voix, batterie, basse, autres instruments")
         
-        # Appliquer le modèle
-        with torch.no_grad():
-            sources = apply_model(model, audio_tensor, progress=True)
+        # Appliquer le modèle (FP16 via autocast sur GPU : Tensor Cores,
+        # moitié moins de VRAM ; les STFT internes restent en FP32)
+        with torch.inference_mode(), torch.autocast('cuda', dtype=torch.float16,
+                                                    enabled=use_fp16(device)):
+            sources = apply_model(model, audio_tensor, segment=DEMUCS_SEGMENT,
+                                  overlap=DEMUCS_OVERLAP, shifts=0, split=True,
+                                  progress=True, device=device)
         
         # sources shape: (batch, n_sources, channels, samples)
         # Sources order: drums, bass, other, vocals
-        sources = sources.squeeze(0).cpu().numpy()
+        sources = sources.squeeze(0).float().cpu().numpy()
         
         source_names = model.sources  # ['drums', 'bass', 'other', 'vocals']
         print(f"\n📋 Sources séparées: {source_names}")
@@ -8,12 +8,15 @@ Date: Décembre 2025
 """
 
 import os
+from math import gcd
 import torch
 import numpy as np
 import soundfile as sf
 from scipy import signal as sig
 from pathlib import Path
 
+from extract_vocals import load_model, separate_stems
+
 def extract_vocals_clean(input_file="audio_bruit_test.wav", aggressive=True):
     """
     Extrait les voix avec suppression agressive des résidus percussifs.
@@ -35,66 +38,57 @@ def extract_vocals_clean(input_file="audio_bruit_test.wav", aggressive=True):
     print(f"🔧 Mode agressif: {'OUI' if aggressive else 'NON'}")
     
     try:
-        from demucs.pretrained import get_model
-        from demucs.apply import apply_model
-        
         # === ÉTAPE 1: Séparation Demucs ===
         print("\n" + "-"*40)
         print("📌 ÉTAPE 1: Séparation Demucs")
         print("-"*40)
         
+        device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        
         # Essayer le modèle fine-tuné pour une meilleure séparation vocale
+        # (chargé une seule fois par processus, voir load_model)
         model_name = 'htdemucs_ft' if aggressive else 'htdemucs'
         try:
             print(f"⏳ Chargement du modèle {model_name}...")
-            model = get_model(model_name)
+            model = load_model(model_name, device, quantize=False)
         except:
             print(f"⚠️  Modèle {model_name} non disponible, utilisation de htdemucs")
-            model = get_model('htdemucs')
-        
-        model.eval()
-        device = 'cuda' if torch.cuda.is_available() else 'cpu'
+            model = load_model('htdemucs', device, quantize=False)
         print(f"   Appareil: {device.upper()}")
-        model.to(device)
         
-        # Charger l'audio
-        audio, sr = sf.read(input_file)
+        # Charger l'audio directement en float32 (samples, channels)
+        audio, sr = sf.read(input_file, dtype='float32', always_2d=True)
         original_sr = sr
         print(f"   - Fréquence: {sr} Hz")
         print(f"   - Durée: {len(audio)/sr:.2f} secondes")
         
         # Convertir en stéréo si mono
-        if len(audio.shape) == 1:
-            audio = np.stack([audio, audio], axis=1)
-        if audio.shape[1] != 2:
-            audio = audio[:, :2]
+        if audio.shape[1] == 1:
+            audio = np.repeat(audio, 2, axis=1)
+        audio = audio[:, :2]
         
         # Rééchantillonner si nécessaire
         target_sr = model.samplerate
         if sr != target_sr:
             print(f"   Rééchantillonnage: {sr} Hz -> {target_sr} Hz")
-            num_samples = int(len(audio) * target_sr / sr)
-            audio = sig.resample(audio, num_samples)
+            # Polyphase (filtre FIR) plutôt qu'une FFT sur tout le signal
+            g = gcd(sr, target_sr)
+            audio = sig.resample_poly(audio, target_sr // g, sr // g, axis=0)
             sr = target_sr
         
-        # Appliquer Demucs
-        audio_tensor = torch.tensor(audio.T, dtype=torch.float32).unsqueeze(0).to(device)
+        # Appliquer Demucs par blocs (seules les voix et les drums sont gardées)
+        # Une seule copie (transposition contiguë), pas de passage en float64
+        audio_tensor = torch.from_numpy(np.ascontiguousarray(audio.T, dtype=np.float32))
         
         print("\n⏳ Séparation en cours...")
-        with torch.no_grad():
-            sources = apply_model(model, audio_tensor, progress=True)
-        
-        sources = sources.squeeze(0).cpu().numpy()
-        source_names = model.sources  # ['drums', 'bass', 'other', 'vocals']
-        
-        # Récupérer les sources
-        drums_idx = source_names.index('drums')
-        vocals_idx = source_names.index('vocals')
-        other_idx = source_names.index('other')
-        
-        vocals = sources[vocals_idx].T  # (samples, channels)
-        drums = sources[drums_idx].T
-        other = sources[other_idx].T
+        # Mixage mono fait sur le device ; sur GPU les sources y restent
+        # pour le post-traitement (aucun aller-retour CPU)
+        use_torch = device == 'cuda'
+        vocals_mono, drums_mono = separate_stems(model, audio_tensor, ('vocals', 'drums'),
+                                                 device, mono=True, output_device=device)[:, 0]
+        if not use_torch:
+            vocals_mono = vocals_mono.numpy()
+            drums_mono = drums_mono.numpy()
         
         print(f"✅ Séparation initiale terminée")
         
@@ -103,25 +97,34 @@ def extract_vocals_clean(input_file="audio_bruit_test.wav", aggressive=True):
         print("📌 ÉTAPE 2: Suppression des résidus percussifs")
         print("-"*40)
         
-        # Convertir en mono pour le traitement
-        vocals_mono = np.mean(vocals, axis=1)
-        drums_mono = np.mean(drums, axis=1)
+        target_len = len(vocals_mono)
         
         # STFT pour analyse spectrale
         nperseg = 2048
         noverlap = nperseg * 3 // 4
-        
-        f, t, vocals_stft = sig.stft(vocals_mono, sr, nperseg=nperseg, noverlap=noverlap)
-        _, _, drums_stft = sig.stft(drums_mono, sr, nperseg=nperseg, noverlap=noverlap)
-        
-        vocals_mag = np.abs(vocals_stft)
-        vocals_phase = np.angle(vocals_stft)
-        drums_mag = np.abs(drums_stft)
+        f = np.fft.rfftfreq(nperseg, 1 / sr)
+        
+        if use_torch:
+            # STFT cuFFT sur le device de Demucs (pas d'aller-retour CPU)
+            window = torch.hann_window(nperseg, device=device)
+            stft_args = dict(n_fft=nperseg, hop_length=nperseg - noverlap,
+                             win_length=nperseg, window=window)
+            vocals_stft = torch.stft(vocals_mono, return_complex=True, **stft_args)
+            drums_stft = torch.stft(drums_mono, return_complex=True, **stft_args)
+        else:
+            _, _, vocals_stft = sig.stft(vocals_mono, sr, nperseg=nperseg, noverlap=noverlap)
+            _, _, drums_stft = sig.stft(drums_mono, sr, nperseg=nperseg, noverlap=noverlap)
+        
+        # abs/clip existent pour les tenseurs torch et les tableaux NumPy
+        vocals_mag = abs(vocals_stft)
         
         # Soustraction spectrale agressive des résidus de drums
-        # On soustrait une version amplifiée du spectre des drums
+        # On soustrait une version amplifiée du spectre des drums, exprimée
+        # en gain réel |V_clean| / |V| : la phase reste dans le spectre complexe
         subtraction_factor = 2.5 if aggressive else 1.5
-        vocals_mag_clean = np.maximum(vocals_mag - subtraction_factor * drums_mag, 0)
+        gain = (vocals_mag - subtraction_factor * abs(drums_stft)).clip(min=0)
+        gain /= vocals_mag.clip(min=1e-8)
+        del vocals_mag, drums_stft
         
         print(f"   Facteur de soustraction: {subtraction_factor}x")
         
@@ -137,34 +140,38 @@ def extract_vocals_clean(input_file="audio_bruit_test.wav", aggressive=True):
         
         print(f"   Bande passante: {freq_low} Hz - {freq_high} Hz")
         
-        # Créer un masque fréquentiel
-        freq_mask = np.ones_like(vocals_mag_clean)
+        # Créer un masque fréquentiel (un gain par fréquence, appliqué
+        # à toutes les frames par broadcasting)
+        freq_mask = np.ones(len(f), dtype=np.float32)
         
         # Atténuer les hautes fréquences (où se trouvent les maracas)
-        high_freq_idx = np.where(f > freq_high)[0]
-        for idx in high_freq_idx:
-            # Atténuation progressive
-            attenuation = np.exp(-0.001 * (f[idx] - freq_high))
-            freq_mask[idx, :] = attenuation
+        # Atténuation progressive
+        high = f > freq_high
+        freq_mask[high] = np.exp(-0.001 * (f[high] - freq_high))
         
         # Atténuer les très basses fréquences
-        low_freq_idx = np.where(f < freq_low)[0]
-        for idx in low_freq_idx:
-            freq_mask[idx, :] = 0.1
+        freq_mask[f < freq_low] = 0.1
         
-        vocals_mag_filtered = vocals_mag_clean * freq_mask
+        if use_torch:
+            freq_mask = torch.from_numpy(freq_mask).to(device)
+        gain *= freq_mask[:, None]
         
         # === ÉTAPE 4: Reconstruction ===
         print("\n" + "-"*40)
         print("📌 ÉTAPE 4: Reconstruction du signal")
         print("-"*40)
         
-        # Reconstruire le signal
-        vocals_stft_clean = vocals_mag_filtered * np.exp(1j * vocals_phase)
-        _, vocals_clean = sig.istft(vocals_stft_clean, sr, nperseg=nperseg, noverlap=noverlap)
+        # Reconstruire le signal (gain appliqué en place sur le spectre
+        # complexe : pas de phase à recombiner avec exp(1j * phase))
+        vocals_stft *= gain
+        if use_torch:
+            vocals_clean = torch.istft(vocals_stft, length=target_len, **stft_args)
+            # Seul transfert GPU -> CPU : le signal final
+            vocals_clean = vocals_clean.cpu().numpy()
+        else:
+            _, vocals_clean = sig.istft(vocals_stft, sr, nperseg=nperseg, noverlap=noverlap)
         
         # Ajuster la longueur
-        target_len = len(vocals_mono)
         if len(vocals_clean) > target_len:
             vocals_clean = vocals_clean[:target_len]
         elif len(vocals_clean) < target_len:
@@ -8,15 +8,16 @@ Date: Décembre 2025
 """
 
 import os
+from math import gcd
 import subprocess
 import numpy as np
-import soundfile as sf
 from pathlib import Path
-import tempfile
 import shutil
 import torch
 from scipy import signal as sig
 
+from extract_vocals import load_model, separate_stems
+
 
 def get_ffmpeg_path():
     """Trouve le chemin de ffmpeg."""
@@ -63,10 +64,9 @@ def extract_vocals_from_video(input_video, output_video=None):
     
     print(f"📁 Vidéo sortie: {output_video}")
     
-    # Dossier temporaire
-    temp_dir = tempfile.mkdtemp(prefix="video_vocals_")
-    temp_audio = os.path.join(temp_dir, "audio_extracted.wav")
-    temp_audio_vocals = os.path.join(temp_dir, "audio_vocals.wav")
+    # L'audio transite par des pipes ffmpeg (float32 brut) : aucun WAV
+    # temporaire écrit puis relu sur disque
+    sr = 44100
     
     try:
         # === ÉTAPE 1: Extraire l'audio ===
@@ -76,18 +76,22 @@ def extract_vocals_from_video(input_video, output_video=None):
         
         cmd_extract = [
             ffmpeg, "-i", input_video,
-            "-vn", "-acodec", "pcm_s16le",
-            "-ar", "44100", "-ac", "2",
-            "-y", temp_audio
+            "-vn", "-f", "f32le", "-acodec", "pcm_f32le",
+            "-ar", str(sr), "-ac", "2",
+            "pipe:1"  # Sortie standard
         ]
         
         print(f"   Extraction en cours...")
-        subprocess.run(cmd_extract, capture_output=True, text=True)
+        result = subprocess.run(cmd_extract, capture_output=True)
         
-        if not os.path.exists(temp_audio):
+        if result.returncode != 0 or not result.stdout:
             print(f"❌ Échec de l'extraction audio")
+            print(f"   Erreur: {result.stderr.decode(errors='replace')}")
             return None
         
+        # (samples, 2) en float32, sans copie du buffer de ffmpeg
+        audio = np.frombuffer(result.stdout, dtype=np.float32).reshape(-1, 2)
+        del result
         print(f"   ✅ Audio extrait")
         
         # === ÉTAPE 2: Séparation vocale avec Demucs ===
@@ -95,51 +99,36 @@ def extract_vocals_from_video(input_video, output_video=None):
         print("📌 ÉTAPE 2: Séparation vocale (Demucs IA)")
         print("-"*40)
         
-        from demucs.pretrained import get_model
-        from demucs.apply import apply_model
+        device = 'cuda' if torch.cuda.is_available() else 'cpu'
         
-        # Charger le modèle
+        # Charger le modèle (une seule fois par processus, voir load_model)
         print("   ⏳ Chargement du modèle htdemucs_ft...")
         try:
-            model = get_model('htdemucs_ft')
+            model = load_model('htdemucs_ft', device, quantize=False)
         except:
             print("   ⚠️ htdemucs_ft non disponible, utilisation de htdemucs")
-            model = get_model('htdemucs')
-        
-        model.eval()
-        device = 'cuda' if torch.cuda.is_available() else 'cpu'
+            model = load_model('htdemucs', device, quantize=False)
         print(f"   Appareil: {device.upper()}")
-        model.to(device)
         
-        # Charger l'audio
-        audio, sr = sf.read(temp_audio)
         print(f"   - Fréquence: {sr} Hz")
         print(f"   - Durée: {len(audio)/sr:.2f} secondes")
         
-        # Préparer pour Demucs
-        if len(audio.shape) == 1:
-            audio = np.stack([audio, audio], axis=1)
-        
         target_sr = model.samplerate
         if sr != target_sr:
             print(f"   Rééchantillonnage: {sr} Hz -> {target_sr} Hz")
-            num_samples = int(len(audio) * target_sr / sr)
-            audio = sig.resample(audio, num_samples)
+            # Polyphase (filtre FIR) plutôt qu'une FFT sur tout le signal
+            g = gcd(sr, target_sr)
+            audio = sig.resample_poly(audio, target_sr // g, sr // g, axis=0)
             sr = target_sr
         
-        # Appliquer Demucs
-        audio_tensor = torch.tensor(audio.T, dtype=torch.float32).unsqueeze(0).to(device)
+        # Appliquer Demucs par blocs (seules les voix sont gardées)
+        # Une seule copie (transposition contiguë) du float32 lu dans le pipe
+        audio_tensor = torch.from_numpy(np.ascontiguousarray(audio.T, dtype=np.float32))
         
         print("\n   ⏳ Séparation en cours (peut prendre quelques minutes)...")
-        with torch.no_grad():
-            sources = apply_model(model, audio_tensor, progress=True)
-        
-        sources = sources.squeeze(0).cpu().numpy()
-        source_names = model.sources
         
         # Extraire les voix
-        vocals_idx = source_names.index('vocals')
-        vocals = sources[vocals_idx].T
+        vocals = separate_stems(model, audio_tensor, ('vocals',), device)[0].numpy().T
         
         print(f"   ✅ Voix extraites!")
         
@@ -154,9 +143,11 @@ def extract_vocals_from_video(input_video, output_video=None):
             import noisereduce as nr
             print("   🧠 Application de noisereduce...")
             
-            vocals_clean_L = nr.reduce_noise(y=vocals[:, 0], sr=sr, stationary=False, prop_decrease=0.6)
-            vocals_clean_R = nr.reduce_noise(y=vocals[:, 1], sr=sr, stationary=False, prop_decrease=0.6)
-            vocals_clean = np.stack([vocals_clean_L, vocals_clean_R], axis=1)
+            # Demucs a déjà retiré le non-vocal : un profil de bruit
+            # stationnaire suffit. Les deux canaux passent en un seul
+            # appel (entrée (channels, samples)), traités en parallèle
+            vocals_clean = nr.reduce_noise(y=vocals.T, sr=sr, stationary=True,
+                                           prop_decrease=0.6, n_jobs=2).T
         except:
             vocals_clean = vocals
         
@@ -165,9 +156,8 @@ def extract_vocals_from_video(input_video, output_video=None):
         if max_val > 0:
             vocals_clean = vocals_clean / max_val * 0.95
         
-        # Sauvegarder
-        sf.write(temp_audio_vocals, vocals_clean, sr)
-        print(f"   ✅ Audio vocal sauvegardé")
+        pcm_vocals = np.ascontiguousarray(vocals_clean, dtype=np.float32)
+        print(f"   ✅ Audio vocal prêt")
         
         # === ÉTAPE 4: Reconstruire la vidéo ===
         print("\n" + "-"*40)
@@ -177,7 +167,8 @@ def extract_vocals_from_video(input_video, output_video=None):
         cmd_merge = [
             ffmpeg,
             "-i", input_video,
-            "-i", temp_audio_vocals,
+            "-f", "f32le", "-ar", str(sr), "-ac", "2",
+            "-i", "pipe:0",  # Voix (entrée standard)
             "-c:v", "copy",
             "-c:a", "aac",
             "-b:a", "192k",
@@ -189,10 +180,15 @@ def extract_vocals_from_video(input_video, output_video=None):
         ]
         
         print(f"   Reconstruction en cours...")
-        subprocess.run(cmd_merge, capture_output=True, text=True)
+        # Vue octets sur le buffer contigu (pas de copie) : subprocess découpe
+        # l'entrée par offsets en octets, d'où le cast à plat
+        result = subprocess.run(cmd_merge, input=memoryview(pcm_vocals).cast("B"),
+                                capture_output=True)
         
-        if not os.path.exists(output_video):
+        if result.returncode != 0 or not os.path.exists(output_video):
             print(f"❌ Échec de la reconstruction")
+            # La fin de stderr suffit (le message d'erreur de ffmpeg)
+            print(f"   Erreur: {result.stderr[-512:].decode(errors='replace')}")
             return None
         
         print(f"   ✅ Vidéo reconstruite!")
@@ -218,12 +214,6 @@ def extract_vocals_from_video(input_video, output_video=None):
         import traceback
         traceback.print_exc()
         return None
-        
-    finally:
-        try:
-            shutil.rmtree(temp_dir)
-        except:
-            pass
 
 
 def main():
@@ -18,40 +18,52 @@ def generate_test_audio(filename="audio_bruit_test1.wav", duration=5):
     
     # Paramètres
     fs = 48000  # Fréquence d'échantillonnage
-    t = np.linspace(0, duration, int(fs * duration))
+    # float32 de bout en bout (précision de phase suffisante sur quelques
+    # secondes, moitié moins de mémoire)
+    t = np.linspace(0, duration, int(fs * duration), dtype=np.float32)
+    rng = np.random.default_rng()
     
     # Signal propre: combinaison de plusieurs fréquences (voix simulée)
-    signal = (
-        0.3 * np.sin(2 * np.pi * 220 * t) +      # Fondamentale (La3)
-        0.2 * np.sin(2 * np.pi * 440 * t) +      # Harmonique 2 (La4)
-        0.15 * np.sin(2 * np.pi * 880 * t) +     # Harmonique 3
-        0.1 * np.sin(2 * np.pi * 330 * t)        # Composante intermédiaire
-    )
+    freqs = np.array([
+        220,   # Fondamentale (La3)
+        440,   # Harmonique 2 (La4)
+        880,   # Harmonique 3
+        330,   # Composante intermédiaire
+    ], dtype=np.float32)
+    amps = np.array([0.3, 0.2, 0.15, 0.1], dtype=np.float32)
+    # Un seul passage sin sur la matrice (fréquences x temps), puis la
+    # somme pondérée en un produit matriciel
+    signal = amps @ np.sin(np.float32(2 * np.pi) * np.outer(freqs, t))
     
     # Bruit large bande (bruit blanc)
     noise_amplitude = 0.4  # Bruit relativement fort
-    noise = noise_amplitude * np.random.randn(len(t))
+    noise = rng.standard_normal(len(t), dtype=np.float32)
+    noise *= noise_amplitude
     
     # Ajout de bruit coloré (bruit rose - plus réaliste)
     # Filtrage du bruit blanc pour simuler un bruit environnemental
-    from scipy.signal import butter, lfilter
+    from scipy.signal import butter, sosfilt
     
     def pink_noise(white_noise):
         """Convertit bruit blanc en bruit rose (1/f)"""
-        b, a = butter(1, 0.1, btype='low')
-        pink = lfilter(b, a, white_noise)
-        return pink / np.max(np.abs(pink)) * noise_amplitude
+        # Sections du second ordre, en float32 : sosfilt garde le type du signal
+        sos = butter(1, 0.1, btype='low', output='sos').astype(np.float32)
+        pink = sosfilt(sos, white_noise)
+        # Normalisation et amplitude en une seule multiplication en place
+        pink *= noise_amplitude / max(pink.max(), -pink.min())
+        return pink
     
     colored_noise = pink_noise(noise)
     
     # Signal bruité = signal + bruit
     noisy_signal = signal + colored_noise
     
-    # Normalisation
-    noisy_signal = noisy_signal / np.max(np.abs(noisy_signal)) * 0.8
+    # Normalisation et mise à l'échelle int16 en place, en un seul facteur
+    noisy_signal *= 0.8 * 32767 / np.max(np.abs(noisy_signal))
     
-    # Conversion en int16
-    noisy_signal_int16 = (noisy_signal * 32767).astype(np.int16)
+    # Conversion en int16 (écrêtage : pas de repliement en cas de dépassement)
+    np.clip(noisy_signal, -32768, 32767, out=noisy_signal)
+    noisy_signal_int16 = noisy_signal.astype(np.int16)
     
     # Sauvegarde
     wavfile.write(filename, fs, noisy_signal_int16)
@@ -6,58 +6,69 @@ et extraire uniquement les parties en anglais.
 
 from youtube_transcript_api import YouTubeTranscriptApi
 import re
+from bisect import bisect_right
+
+# Formats d'URL YouTube, compilés une seule fois
+_VIDEO_ID_PATTERNS = [re.compile(p) for p in (
+    r'(?:v=|\/)([0-9A-Za-z_-]{11}).*',
+    r'(?:embed\/)([0-9A-Za-z_-]{11})',
+    r'(?:youtu\.be\/)([0-9A-Za-z_-]{11})',
+)]
 
 def get_video_id(url):
     """Extrait l'ID de la vidéo depuis l'URL YouTube."""
-    patterns = [
-        r'(?:v=|\/)([0-9A-Za-z_-]{11}).*',
-        r'(?:embed\/)([0-9A-Za-z_-]{11})',
-        r'(?:youtu\.be\/)([0-9A-Za-z_-]{11})',
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, url)
+    for pattern in _VIDEO_ID_PATTERNS:
+        match = pattern.search(url)
         if match:
             return match.group(1)
     return None
 
+ENGLISH_WORDS = {
+    'the', 'a', 'an', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
+    'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
+    'should', 'may', 'might', 'must', 'shall', 'can', 'need', 'dare',
+    'ought', 'used', 'to', 'of', 'in', 'for', 'on', 'with', 'at', 'by',
+    'from', 'as', 'into', 'through', 'during', 'before', 'after', 'above',
+    'below', 'between', 'under', 'again', 'further', 'then', 'once',
+    'here', 'there', 'when', 'where', 'why', 'how', 'all', 'each', 'few',
+    'more', 'most', 'other', 'some', 'such', 'no', 'nor', 'not', 'only',
+    'own', 'same', 'so', 'than', 'too', 'very', 'just', 'and', 'but',
+    'if', 'or', 'because', 'until', 'while', 'this', 'that', 'these',
+    'those', 'what', 'which', 'who', 'whom', 'i', 'you', 'he', 'she', 'it',
+    'we', 'they', 'me', 'him', 'her', 'us', 'them', 'my', 'your', 'his',
+    'its', 'our', 'their', 'mine', 'yours', 'hers', 'ours', 'theirs',
+    'god', 'lord', 'jesus', 'christ', 'spirit', 'holy', 'prayer', 'pray',
+    'church', 'faith', 'love', 'hope', 'grace', 'blessing', 'amen',
+    'people', 'man', 'woman', 'children', 'life', 'world', 'time', 'year',
+    'day', 'way', 'thing', 'word', 'work', 'know', 'think', 'see', 'come',
+    'want', 'give', 'use', 'find', 'tell', 'ask', 'seem', 'feel', 'try',
+    'leave', 'call', 'good', 'new', 'first', 'last', 'long', 'great',
+    'little', 'own', 'old', 'right', 'big', 'high', 'different', 'small',
+    'large', 'next', 'early', 'young', 'important', 'public', 'bad',
+    'same', 'able', 'excellence', 'award', 'thank', 'thanks', 'please',
+    'welcome', 'hello', 'yes', 'okay', 'now', 'today', 'tonight', 'morning',
+    'evening', 'night', 'minister', 'ministry', 'pastor', 'brother', 'sister'
+}
+
+# Tokenisation et comptage des mots anglais faits par le moteur re (en C)
+# plutôt que par une boucle Python sur chaque mot
+WORD_RE = re.compile(r'\b[a-zA-Z]+\b')
+ENGLISH_RE = re.compile(
+    r'\b(?:' + '|'.join(sorted(ENGLISH_WORDS, key=len, reverse=True)) + r')\b'
+)
+
 def is_english_text(text):
     """
     Détecte si le texte est principalement en anglais.
     """
-    english_words = {
-        'the', 'a', 'an', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
-        'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
-        'should', 'may', 'might', 'must', 'shall', 'can', 'need', 'dare',
-        'ought', 'used', 'to', 'of', 'in', 'for', 'on', 'with', 'at', 'by',
-        'from', 'as', 'into', 'through', 'during', 'before', 'after', 'above',
-        'below', 'between', 'under', 'again', 'further', 'then', 'once',
-        'here', 'there', 'when', 'where', 'why', 'how', 'all', 'each', 'few',
-        'more', 'most', 'other', 'some', 'such', 'no', 'nor', 'not', 'only',
-        'own', 'same', 'so', 'than', 'too', 'very', 'just', 'and', 'but',
-        'if', 'or', 'because', 'until', 'while', 'this', 'that', 'these',
-        'those', 'what', 'which', 'who', 'whom', 'i', 'you', 'he', 'she', 'it',
-        'we', 'they', 'me', 'him', 'her', 'us', 'them', 'my', 'your', 'his',
-        'its', 'our', 'their', 'mine', 'yours', 'hers', 'ours', 'theirs',
-        'god', 'lord', 'jesus', 'christ', 'spirit', 'holy', 'prayer', 'pray',
-        'church', 'faith', 'love', 'hope', 'grace', 'blessing', 'amen',
-        'people', 'man', 'woman', 'children', 'life', 'world', 'time', 'year',
-        'day', 'way', 'thing', 'word', 'work', 'know', 'think', 'see', 'come',
-        'want', 'give', 'use', 'find', 'tell', 'ask', 'seem', 'feel', 'try',
-        'leave', 'call', 'good', 'new', 'first', 'last', 'long', 'great',
-        'little', 'own', 'old', 'right', 'big', 'high', 'different', 'small',
-        'large', 'next', 'early', 'young', 'important', 'public', 'bad',
-        'same', 'able', 'excellence', 'award', 'thank', 'thanks', 'please',
-        'welcome', 'hello', 'yes', 'okay', 'now', 'today', 'tonight', 'morning',
-        'evening', 'night', 'minister', 'ministry', 'pastor', 'brother', 'sister'
-    }
-    
-    words = re.findall(r'\b[a-zA-Z]+\b', text.lower())
-    
-    if len(words) < 3:
+    text_lower = text.lower()
+    total = len(WORD_RE.findall(text_lower))
+    
+    if total < 3:
         return False
     
-    english_count = sum(1 for word in words if word in english_words)
-    ratio = english_count / len(words) if words else 0
+    english_count = len(ENGLISH_RE.findall(text_lower))
+    ratio = english_count / total
     
     return ratio > 0.25
 
@@ -129,6 +140,9 @@ def extract_english_parts(transcript):
         (11028, 11579),
         (12890, 13240)
     ]
+    # Plages triées et disjointes : recherche dichotomique sur les débuts
+    range_starts = [start for start, _ in FORCE_INCLUDE_RANGES]
+    range_ends = [end for _, end in FORCE_INCLUDE_RANGES]
     
     english_segments = []
     current_english_block = []
@@ -141,11 +155,8 @@ def extract_english_parts(transcript):
             continue
         
         # Vérifier si on est dans une plage forcée
-        is_forced = False
-        for start_range, end_range in FORCE_INCLUDE_RANGES:
-            if start_range <= start_time <= end_range:
-                is_forced = True
-                break
+        i = bisect_right(range_starts, start_time) - 1
+        is_forced = i >= 0 and start_time <= range_ends[i]
 
         if is_forced or is_english_text(text):
             current_english_block.append({
@@ -195,9 +206,10 @@ def main():
 
     # Sauvegarder la transcription brute pour analyse
     with open("raw_transcript.txt", "w", encoding="utf-8") as f:
-        for entry in transcript:
-            start = format_time(entry['start'])
-            f.write(f"[{start}] {entry['text']}\n")
+        f.write(''.join(
+            f"[{format_time(entry['start'])}] {entry['text']}\n"
+            for entry in transcript
+        ))
     print("💾 Transcription brute sauvegardée dans raw_transcript.txt")
     
     # Extraire les parties anglaises
@@ -210,31 +222,24 @@ def main():
     print("=" * 60)
     print()
     
+    # Chaque bloc est mis en forme une seule fois, pour la console et
+    # pour le fichier
+    rendered_blocks = []
     for i, block in enumerate(english_parts, 1):
         if block:
             start_time = format_time(block[0]['start'])
             end_time = format_time(block[-1]['start'] + block[-1]['duration'])
-            
-            print(f"--- Bloc {i} [{start_time} - {end_time}] ---")
-            
-            block_text = ' '.join([entry['text'] for entry in block])
-            print(block_text)
-            print()
+            block_text = ' '.join(entry['text'] for entry in block)
+            rendered_blocks.append(f"--- Bloc {i} [{start_time} - {end_time}] ---\n{block_text}\n\n")
+    
+    print(''.join(rendered_blocks), end='')
     
     # Sauvegarder dans un fichier
     output_file = "youtube_english_transcript.txt"
     with open(output_file, 'w', encoding='utf-8') as f:
         f.write(f"Transcription anglaise de: {video_url}\n")
         f.write("=" * 60 + "\n\n")
-        
-        for i, block in enumerate(english_parts, 1):
-            if block:
-                start_time = format_time(block[0]['start'])
-                end_time = format_time(block[-1]['start'] + block[-1]['duration'])
-                
-                f.write(f"--- Bloc {i} [{start_time} - {end_time}] ---\n")
-                block_text = ' '.join([entry['text'] for entry in block])
-                f.write(block_text + "\n\n")
+        f.writelines(rendered_blocks)
     
     print("=" * 60)
     print(f"✅ Transcription sauvegardée dans: {output_file}")
@@ -1,7 +1,8 @@
 """
 📝 Script de Transcription Vidéo/Audio - Projet Audio HERMANN
 ==============================================================
-Utilise Whisper (OpenAI) pour transcrire l'audio en texte.
+Utilise Whisper pour transcrire l'audio en texte : faster-whisper
+(CTranslate2, int8/float16) par défaut, Whisper (OpenAI) en secours.
 
 Formats supportés: MP4, MKV, AVI, MOV, WAV, MP3, etc.
 Langues: Détection automatique ou spécifiée
@@ -11,15 +12,92 @@ Date: Décembre 2025
 """
 
 import os
+import functools
+import importlib.util
 import subprocess
-import tempfile
 import shutil
+import threading
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import whisper
 
+import numpy as np
 
+# faster-whisper (CTranslate2) : matmuls int8/float16 et attention fusionnée
+try:
+    from faster_whisper import WhisperModel
+    FASTER_WHISPER_AVAILABLE = True
+except ImportError:
+    FASTER_WHISPER_AVAILABLE = False
+
+# Transcription par lots de fenêtres de 30 s (faster-whisper >= 1.1)
+try:
+    from faster_whisper import BatchedInferencePipeline
+    BATCHED_AVAILABLE = True
+except ImportError:
+    BATCHED_AVAILABLE = False
+
+# Silero VAD (fourni par faster-whisper) : suppression des silences avant
+# le décodage pour les autres backends
+try:
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+    VAD_AVAILABLE = True
+except ImportError:
+    VAD_AVAILABLE = False
+
+# Whisper de référence (OpenAI) : backend de secours
+try:
+    import whisper
+    WHISPER_AVAILABLE = True
+except ImportError:
+    WHISPER_AVAILABLE = False
+
+# Whisper via Hugging Face transformers : attention SDPA / Flash Attention 2
+try:
+    from transformers import pipeline as hf_pipeline
+    TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    TRANSFORMERS_AVAILABLE = False
+
+# Backends par ordre de préférence quand celui demandé est absent
+BACKEND_AVAILABLE = {
+    "faster-whisper": FASTER_WHISPER_AVAILABLE,
+    "openai": WHISPER_AVAILABLE,
+    "transformers": TRANSFORMERS_AVAILABLE,
+}
+
+# Fenêtres de 30 s transcrites ensemble (dimension batch) : le GPU est
+# sous-utilisé à batch=1 ; sur CPU, des lots plus petits limitent la RAM
+BATCH_SIZE_GPU = 16
+BATCH_SIZE_CPU = 4
+
+# Fréquence d'échantillonnage attendue par Whisper
+SAMPLE_RATE = 16000
+
+# Silences plus longs que ceci retirés avant le décodage (VAD)
+VAD_PARAMETERS = {"min_silence_duration_ms": 500}
+
+# Dépôts Hugging Face des tailles qui ne suivent pas "openai/whisper-{taille}"
+HF_WHISPER_MODELS = {
+    "large": "openai/whisper-large-v3",
+    "distil-large-v3": "distil-whisper/distil-large-v3",
+    "distil-medium.en": "distil-whisper/distil-medium.en",
+}
+
+# Modèles distillés : précision proche de medium/large, décodage bien plus
+# rapide, mais entraînés sur l'anglais uniquement (garder "medium" /
+# "large" pour le français). Non chargeables par Whisper (OpenAI).
+DISTIL_MODELS = ("distil-large-v3", "distil-medium.en")
+
+# Modèles chargés, réutilisés d'un appel à l'autre :
+# (backend, taille, device, compute_type) -> modèle
+_MODEL_CACHE = {}
+_model_cache_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=1)
 def get_ffmpeg_path():
-    """Trouve le chemin de ffmpeg."""
+    """Trouve le chemin de ffmpeg (recherche faite une fois par processus)."""
     conda_env = Path(r"c:\Users\nichi\Documents\HERMANN\Projet_audio\.conda")
     ffmpeg_conda = conda_env / "Library" / "bin" / "ffmpeg.exe"
     
@@ -33,35 +111,265 @@ def get_ffmpeg_path():
     return "ffmpeg"
 
 
-def transcribe_media(input_file, language=None, model_size="base", output_formats=["txt", "srt"]):
+def get_faster_whisper_device():
+    """
+    Choisit le device et le type de calcul CTranslate2.
+    
+    Returns:
+        tuple: ("cuda", "float16") si un GPU CUDA est visible, sinon ("cpu", "int8")
+    """
+    try:
+        import ctranslate2
+        if ctranslate2.get_cuda_device_count() > 0:
+            return "cuda", "float16"
+    except Exception:
+        pass
+    return "cpu", "int8"
+
+
+def get_openai_whisper_device():
+    """
+    Choisit le device PyTorch pour Whisper (OpenAI).
+    
+    Returns:
+        str: "cuda" si un GPU CUDA est disponible, sinon "cpu"
+    """
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def _quantize_openai_whisper(model):
+    """
+    Quantification int8 des poids (torchao, int8_weight_only) des couches
+    Linear de Whisper (OpenAI) sur GPU : à batch=1 le décodage est limité
+    par la lecture des poids, 4x plus légers en int8. Sans effet sur CPU
+    ou sans torchao.
+    """
+    if model.device.type == "cuda" and importlib.util.find_spec("torchao"):
+        try:
+            from torchao.quantization import quantize_, int8_weight_only
+            quantize_(model, int8_weight_only())
+            print("   ⚡ Poids Linear quantifiés en int8 (torchao)")
+        except Exception as e:
+            print(f"   ⚠️ Quantification int8 indisponible: {e}")
+
+
+def _compile_openai_whisper(model):
+    """
+    torch.compile (mode 'reduce-overhead' : capture CUDA Graph) de
+    l'encodeur de Whisper (OpenAI), dont l'entrée a une forme fixe (30 s
+    de mel). Le décodeur reste eager : son cache K/V grandit à chaque
+    token, chaque pas aurait une forme nouvelle (recompilation ou un
+    graphe par longueur). Sans effet sur CPU ou sans Triton (absent des
+    installations Windows standard).
+    """
+    import torch
+    if model.device.type == "cuda" and hasattr(torch, "compile") and importlib.util.find_spec("triton"):
+        eager_forward = model.encoder.forward
+        try:
+            # Compiler le forward (transcribe() reste la méthode Python
+            # du modèle, qui appelle l'encodeur)
+            model.encoder.forward = torch.compile(eager_forward, mode="reduce-overhead")
+            # torch.compile est paresseux : 1er appel = compilation, 2e =
+            # capture du CUDA Graph, sur un mel nul de la forme réelle
+            # (FP16, sans gradient, comme dans transcribe)
+            mel = torch.zeros(1, model.dims.n_mels, whisper.audio.N_FRAMES,
+                              dtype=torch.float16, device=model.device)
+            with torch.no_grad():
+                for _ in range(2):
+                    model.encoder(mel)
+            torch.cuda.synchronize()
+            print("   ⚡ Encodeur compilé (torch.compile)")
+        except Exception as e:
+            # Retour au forward eager d'origine
+            model.encoder.forward = eager_forward
+            print(f"   ⚠️ torch.compile indisponible, exécution sans compilation: {e}")
+
+
+def strip_silence(audio):
+    """
+    Ne garde que les passages parlés de l'audio (Silero VAD).
+    
+    Args:
+        audio: Signal 16 kHz en float32
+    
+    Returns:
+        (audio_parole, to_original) où to_original(t, is_end=False)
+        convertit un temps de audio_parole en temps de l'audio d'origine,
+        ou (audio, None) si aucune parole n'est détectée
+    """
+    chunks = get_speech_timestamps(audio, VadOptions(**VAD_PARAMETERS))
+    if not chunks:
+        return audio, None
+    
+    # Table de correspondance, en échantillons : début de chaque passage
+    # dans l'audio concaténé et dans l'audio d'origine
+    speech_starts = []
+    original_starts = []
+    position = 0
+    for chunk in chunks:
+        speech_starts.append(position)
+        original_starts.append(chunk["start"])
+        position += chunk["end"] - chunk["start"]
+    
+    def to_original(t, is_end=False):
+        sample = t * SAMPLE_RATE
+        # Une fin pile sur une frontière appartient au passage précédent
+        i = (bisect_left if is_end else bisect_right)(speech_starts, sample) - 1
+        i = max(i, 0)
+        return (original_starts[i] + sample - speech_starts[i]) / SAMPLE_RATE
+    
+    speech = np.concatenate([audio[chunk["start"]:chunk["end"]] for chunk in chunks])
+    return speech, to_original
+
+
+def resolve_backend(backend, model_size=None):
+    """
+    Renvoie le backend demandé s'il est installé, sinon le premier
+    backend disponible (ou None si aucun). Les modèles distillés excluent
+    Whisper (OpenAI).
+    """
+    candidates = {
+        name: available for name, available in BACKEND_AVAILABLE.items()
+        if not (model_size in DISTIL_MODELS and name == "openai")
+    }
+    if candidates.get(backend):
+        return backend
+    for name, available in candidates.items():
+        if available:
+            return name
+    return None
+
+
+def _warmup_model(model, backend, device):
+    """
+    Transcrit 1 s de silence juste après le chargement sur GPU :
+    compilation JIT, capture CUDA Graph et auto-tuning cuDNN sont payés
+    ici plutôt que sur le premier fichier. Sans effet sur CPU.
+    """
+    if device != "cuda":
+        return
+    
+    silence = np.zeros(SAMPLE_RATE, dtype=np.float32)
+    try:
+        if backend == "faster-whisper":
+            # Générateur : le consommer pour lancer réellement le décodage
+            segments, _ = model.transcribe(silence, language="en")
+            list(segments)
+        elif backend == "transformers":
+            model({"raw": silence, "sampling_rate": SAMPLE_RATE})
+        else:
+            model.transcribe(silence, fp16=True, language="en", verbose=None)
+        print("   🔥 Modèle préchauffé")
+    except Exception as e:
+        print(f"   ⚠️ Préchauffage ignoré: {e}")
+
+
+def _get_model(model_size, backend):
+    """
+    Charge un modèle Whisper une seule fois par processus.
+    
+    Args:
+        model_size: Taille du modèle ("tiny", "base", ...)
+        backend: "faster-whisper", "openai" ou "transformers"
+    
+    Returns:
+        Modèle chargé (mis en cache dans _MODEL_CACHE)
+    """
+    if backend == "faster-whisper":
+        device, compute_type = get_faster_whisper_device()
+        key = (backend, model_size, device, compute_type)
+    elif backend == "transformers":
+        device = get_openai_whisper_device()
+        # Flash Attention 2 si installé (GPU), sinon SDPA de PyTorch
+        if device == "cuda" and importlib.util.find_spec("flash_attn"):
+            compute_type = "flash_attention_2"
+        else:
+            compute_type = "sdpa"
+        key = (backend, model_size, device, compute_type)
+    else:
+        device = get_openai_whisper_device()
+        key = (backend, model_size, device, None)
+    
+    with _model_cache_lock:
+        if key not in _MODEL_CACHE:
+            print(f"   ⏳ Chargement du modèle '{model_size}'...")
+            print(f"   (Premier chargement = téléchargement, peut prendre du temps)")
+            if backend == "faster-whisper":
+                print(f"   Appareil: {device.upper()} ({compute_type})")
+                _MODEL_CACHE[key] = WhisperModel(model_size, device=device, compute_type=compute_type)
+            elif backend == "transformers":
+                import torch
+                print(f"   Appareil: {device.upper()} (attention {compute_type})")
+                _MODEL_CACHE[key] = hf_pipeline(
+                    "automatic-speech-recognition",
+                    model=HF_WHISPER_MODELS.get(model_size, f"openai/whisper-{model_size}"),
+                    torch_dtype=torch.float16 if device == "cuda" else torch.float32,
+                    device=device,
+                    model_kwargs={"attn_implementation": compute_type},
+                )
+            else:
+                print(f"   Appareil: {device.upper()}")
+                model = whisper.load_model(model_size, device=device)
+                # Quantifié puis compilé une seule fois (la compilation
+                # fusionne la déquantification) : le coût est amorti sur
+                # tous les fichiers grâce au cache
+                _quantize_openai_whisper(model)
+                _compile_openai_whisper(model)
+                _MODEL_CACHE[key] = model
+            _warmup_model(_MODEL_CACHE[key], backend, device)
+        else:
+            print(f"   ♻️ Modèle '{model_size}' déjà chargé")
+        return _MODEL_CACHE[key]
+
+
+def transcribe_media(input_file, language=None, model_size="base", output_formats=["txt", "srt"],
+                     backend="faster-whisper"):
     """
     Transcrit l'audio d'un fichier vidéo ou audio.
     
     Args:
         input_file: Chemin vers le fichier (vidéo ou audio)
         language: Code langue (ex: "fr", "en") ou None pour détection auto
-        model_size: Taille du modèle ("tiny", "base", "small", "medium", "large")
+        model_size: Taille du modèle ("tiny", "base", "small", "medium", "large",
+            ou "distil-large-v3" / "distil-medium.en" pour l'anglais)
         output_formats: Formats de sortie ["txt", "srt", "vtt", "json"]
+        backend: "faster-whisper" (CTranslate2), "openai" (Whisper de
+            référence) ou "transformers" (attention SDPA / Flash Attention 2) ;
+            un autre backend installé est utilisé si celui-ci est absent
     
     Returns:
         Dictionnaire avec les chemins des fichiers générés
     """
+    requested_backend = backend
+    backend = resolve_backend(requested_backend, model_size)
+    
     print("\n" + "="*60)
-    print("📝 TRANSCRIPTION - WHISPER (OpenAI)")
+    print(f"📝 TRANSCRIPTION - WHISPER ({backend or requested_backend})")
     print("="*60)
     
     if not os.path.exists(input_file):
         print(f"❌ Fichier introuvable: {input_file}")
         return None
     
+    if backend is None:
+        print("❌ Aucun backend Whisper installé (pip install faster-whisper)")
+        return None
+    if backend != requested_backend:
+        print(f"⚠️ {requested_backend} non installé, utilisation de {backend}")
+    
     input_path = Path(input_file)
     print(f"📂 Fichier source: {input_file}")
     print(f"🧠 Modèle Whisper: {model_size}")
     print(f"🌍 Langue: {language if language else 'Détection automatique'}")
     
     ffmpeg = get_ffmpeg_path()
-    temp_dir = tempfile.mkdtemp(prefix="whisper_")
-    temp_audio = os.path.join(temp_dir, "audio.wav")
+    
+    # Chargement du modèle lancé en arrière-plan pendant l'extraction
+    # ffmpeg : les deux latences se recouvrent
+    loader = ThreadPoolExecutor(max_workers=1)
+    model_future = loader.submit(_get_model, model_size, backend)
+    loader.shutdown(wait=False)
     
     try:
         # === ÉTAPE 1: Extraire/Convertir l'audio ===
@@ -73,29 +381,36 @@ def transcribe_media(input_file, language=None, model_size="base", output_format
         video_extensions = ['.mp4', '.mkv', '.avi', '.mov', '.webm', '.m4v', '.flv']
         is_video = input_path.suffix.lower() in video_extensions
         
+        # PCM brut 16 kHz mono sur la sortie standard de ffmpeg, lu
+        # directement en mémoire (pas de WAV temporaire écrit puis relu)
         if is_video:
             print(f"   🎬 Extraction de l'audio de la vidéo...")
-            cmd = [
-                ffmpeg, "-i", input_file,
-                "-vn", "-acodec", "pcm_s16le",
-                "-ar", "16000", "-ac", "1",
-                "-y", temp_audio
-            ]
-            subprocess.run(cmd, capture_output=True, text=True)
         else:
             # Convertir l'audio au format requis par Whisper
             print(f"   🎵 Conversion de l'audio...")
-            cmd = [
-                ffmpeg, "-i", input_file,
-                "-ar", "16000", "-ac", "1",
-                "-y", temp_audio
-            ]
-            subprocess.run(cmd, capture_output=True, text=True)
+        # stderr limité aux erreurs (pas de bannière ni de lignes de
+        # progression accumulées en mémoire), non décodé sauf en cas d'échec
+        cmd = [
+            ffmpeg, "-hide_banner", "-loglevel", "error", "-nostdin",
+            "-i", input_file,
+            "-vn", "-f", "s16le", "-acodec", "pcm_s16le",
+            "-ar", "16000", "-ac", "1",
+            "pipe:1"  # Sortie standard
+        ]
+        proc = subprocess.run(cmd, capture_output=True)
         
-        if not os.path.exists(temp_audio):
+        if proc.returncode != 0 or not proc.stdout:
             print(f"❌ Échec de la préparation audio")
+            # La fin de stderr suffit (le message d'erreur de ffmpeg)
+            print(f"   Erreur: {proc.stderr[-512:].decode(errors='replace')}")
+            # Le chargement en cours est laissé se terminer : le modèle
+            # reste en cache pour le fichier suivant
             return None
         
+        # Signal float32 normalisé, format attendu par les trois backends
+        audio = np.frombuffer(proc.stdout, dtype=np.int16).astype(np.float32) / 32768.0
+        del proc
+        
         print(f"   ✅ Audio préparé")
         
         # === ÉTAPE 2: Charger le modèle Whisper ===
@@ -103,9 +418,9 @@ def transcribe_media(input_file, language=None, model_size="base", output_format
         print("📌 ÉTAPE 2: Chargement du modèle Whisper")
         print("-"*40)
         
-        print(f"   ⏳ Chargement du modèle '{model_size}'...")
-        print(f"   (Premier chargement = téléchargement, peut prendre du temps)")
-        model = whisper.load_model(model_size)
+        # Attendre la fin du chargement (les erreurs éventuelles du
+        # thread sont relevées ici)
+        model = model_future.result()
         print(f"   ✅ Modèle chargé!")
         
         # === ÉTAPE 3: Transcription ===
@@ -115,16 +430,72 @@ def transcribe_media(input_file, language=None, model_size="base", output_format
         
         print(f"   ⏳ Analyse et transcription...")
         
-        # Options de transcription
-        options = {
-            "fp16": False,  # Désactiver FP16 sur CPU
-            "verbose": False
-        }
+        # faster-whisper filtre les silences lui-même (vad_filter) ; pour
+        # les autres backends ils sont retirés avant le décodage et les
+        # horodatages ramenés ensuite au temps d'origine
+        to_original = None
+        if backend != "faster-whisper" and VAD_AVAILABLE:
+            audio, to_original = strip_silence(audio)
         
-        if language:
-            options["language"] = language
+        if backend == "faster-whisper":
+            # Segments produits à la demande : même structure que le
+            # résultat de Whisper (OpenAI) pour les écritures TXT/SRT/VTT
+            if BATCHED_AVAILABLE:
+                # Fenêtres de parole (VAD) décodées par lots.
+                # without_timestamps=False : sans cela, un seul segment par
+                # fenêtre (jusqu'à 30 s), trop long pour un sous-titre
+                batch_size = BATCH_SIZE_GPU if model.model.device == "cuda" else BATCH_SIZE_CPU
+                segments, info = BatchedInferencePipeline(model=model).transcribe(
+                    audio, language=language, vad_filter=True, vad_parameters=VAD_PARAMETERS,
+                    beam_size=5, batch_size=batch_size, without_timestamps=False)
+            else:
+                segments, info = model.transcribe(audio, language=language, vad_filter=True,
+                                                  vad_parameters=VAD_PARAMETERS, beam_size=5)
+            result_segments = [
+                {"start": segment.start, "end": segment.end, "text": segment.text}
+                for segment in segments
+            ]
+            result = {
+                "text": "".join(segment["text"] for segment in result_segments),
+                "segments": result_segments,
+                "language": info.language,
+            }
+        elif backend == "transformers":
+            # Fenêtres de 30 s décodées par lots ; "chunks" donne le texte
+            # horodaté
+            generate_kwargs = {"language": language} if language else {}
+            batch_size = BATCH_SIZE_GPU if model.device.type == "cuda" else BATCH_SIZE_CPU
+            output = model({"raw": audio, "sampling_rate": SAMPLE_RATE},
+                           return_timestamps=True, chunk_length_s=30,
+                           batch_size=batch_size, generate_kwargs=generate_kwargs)
+            result_segments = []
+            for chunk in output.get("chunks", []):
+                start, end = chunk["timestamp"]
+                # Le dernier chunk peut ne pas avoir de fin
+                result_segments.append({"start": start, "end": end if end is not None else start,
+                                        "text": chunk["text"]})
+            result = {
+                "text": output["text"],
+                "segments": result_segments,
+                # La pipeline ne renvoie pas la langue détectée
+                "language": language or "unknown",
+            }
+        else:
+            # Options de transcription
+            options = {
+                "fp16": model.device.type == "cuda",  # FP16 sur GPU uniquement
+                "verbose": False
+            }
+            
+            if language:
+                options["language"] = language
+            
+            result = model.transcribe(audio, **options)
         
-        result = model.transcribe(temp_audio, **options)
+        if to_original is not None:
+            for segment in result["segments"]:
+                segment["start"] = to_original(segment["start"])
+                segment["end"] = to_original(segment["end"], is_end=True)
         
         detected_lang = result.get("language", "unknown")
         print(f"   ✅ Transcription terminée!")
@@ -150,32 +521,46 @@ def transcribe_media(input_file, language=None, model_size="base", output_format
             output_files["txt"] = txt_path
             print(f"   ✅ {txt_path}")
         
+        want_srt = "srt" in output_formats
+        want_vtt = "vtt" in output_formats
+        
+        if want_srt or want_vtt:
+            # Un seul parcours des segments pour les horodatages et les
+            # textes nettoyés ; horodatages découpés en une passe NumPy
+            # (HH:MM:SS et mmm : SRT et VTT ne diffèrent que par le
+            # séparateur des millisecondes)
+            seg_starts, seg_ends, seg_texts = [], [], []
+            for segment in result["segments"]:
+                seg_starts.append(segment["start"])
+                seg_ends.append(segment["end"])
+                seg_texts.append(segment["text"].strip())
+            start_hms, start_ms = timestamp_parts(seg_starts)
+            end_hms, end_ms = timestamp_parts(seg_ends)
+            
+            # Cues SRT et VTT construites dans la même boucle ; chaque
+            # fichier est écrit en un seul appel à write()
+            srt_parts = []
+            vtt_parts = ["WEBVTT\n\n"]
+            for i, (sh, sm, eh, em, text) in enumerate(
+                    zip(start_hms, start_ms, end_hms, end_ms, seg_texts), 1):
+                if want_srt:
+                    srt_parts.append(f"{i}\n{sh},{sm} --> {eh},{em}\n{text}\n\n")
+                if want_vtt:
+                    vtt_parts.append(f"{i}\n{sh}.{sm} --> {eh}.{em}\n{text}\n\n")
+        
         # Sous-titres SRT (.srt)
-        if "srt" in output_formats:
+        if want_srt:
             srt_path = str(input_path.parent / f"{base_name}_subtitles.srt")
             with open(srt_path, "w", encoding="utf-8") as f:
-                for i, segment in enumerate(result["segments"], 1):
-                    start = format_timestamp_srt(segment["start"])
-                    end = format_timestamp_srt(segment["end"])
-                    text = segment["text"].strip()
-                    f.write(f"{i}\n")
-                    f.write(f"{start} --> {end}\n")
-                    f.write(f"{text}\n\n")
+                f.write("".join(srt_parts))
             output_files["srt"] = srt_path
             print(f"   ✅ {srt_path}")
         
         # Sous-titres VTT (.vtt)
-        if "vtt" in output_formats:
+        if want_vtt:
             vtt_path = str(input_path.parent / f"{base_name}_subtitles.vtt")
             with open(vtt_path, "w", encoding="utf-8") as f:
-                f.write("WEBVTT\n\n")
-                for i, segment in enumerate(result["segments"], 1):
-                    start = format_timestamp_vtt(segment["start"])
-                    end = format_timestamp_vtt(segment["end"])
-                    text = segment["text"].strip()
-                    f.write(f"{i}\n")
-                    f.write(f"{start} --> {end}\n")
-                    f.write(f"{text}\n\n")
+                f.write("".join(vtt_parts))
             output_files["vtt"] = vtt_path
             print(f"   ✅ {vtt_path}")
         
@@ -208,30 +593,88 @@ def transcribe_media(input_file, language=None, model_size="base", output_format
         import traceback
         traceback.print_exc()
         return None
-        
-    finally:
-        try:
-            shutil.rmtree(temp_dir)
-        except:
-            pass
 
 
-def format_timestamp_srt(seconds):
-    """Formate un timestamp pour SRT (HH:MM:SS,mmm)."""
+def transcribe_batch(files, language=None, model_size="base", output_formats=["txt", "srt"],
+                     backend="faster-whisper"):
+    """
+    Transcrit plusieurs fichiers avec un seul chargement du modèle.
+    
+    Args:
+        files: Chemins des fichiers (vidéo ou audio)
+        language, model_size, output_formats, backend: voir transcribe_media
+    
+    Returns:
+        Dictionnaire {fichier: fichiers générés (ou None en cas d'échec)}
+    """
+    resolved = resolve_backend(backend, model_size)
+    if resolved is None:
+        print("❌ Aucun backend Whisper installé (pip install faster-whisper)")
+        return {}
+    
+    # Modèle chargé une fois : les appels suivants le reprennent du cache
+    print(f"\n🧠 Préchargement du modèle '{model_size}' ({resolved})...")
+    _get_model(model_size, resolved)
+    
+    # Fichiers courts d'abord (la taille sert d'estimation de la durée) :
+    # les premiers résultats arrivent plus vite
+    existing = [f for f in files if os.path.exists(f)]
+    for missing in set(files) - set(existing):
+        print(f"⚠️ Fichier {missing} non trouvé")
+    existing.sort(key=os.path.getsize)
+    
+    results = {}
+    for i, input_file in enumerate(existing, 1):
+        print(f"\n🎯 [{i}/{len(existing)}] Transcription de: {input_file}")
+        results[input_file] = transcribe_media(input_file, language=language, model_size=model_size,
+                                               output_formats=output_formats, backend=resolved)
+    return results
+
+
+def _format_hms_ms(seconds):
+    """Découpe un timestamp en (HH:MM:SS, mmm)."""
     hours = int(seconds // 3600)
     minutes = int((seconds % 3600) // 60)
     secs = int(seconds % 60)
     millis = int((seconds % 1) * 1000)
-    return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}", f"{millis:03d}"
+
+
+def format_timestamp_srt(seconds):
+    """Formate un timestamp pour SRT (HH:MM:SS,mmm)."""
+    return ",".join(_format_hms_ms(seconds))
 
 
 def format_timestamp_vtt(seconds):
     """Formate un timestamp pour VTT (HH:MM:SS.mmm)."""
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
-    millis = int((seconds % 1) * 1000)
-    return f"{hours:02d}:{minutes:02d}:{secs:02d}.{millis:03d}"
+    return ".".join(_format_hms_ms(seconds))
+
+
+def timestamp_parts(seconds):
+    """
+    Découpe un ensemble de timestamps en une passe vectorisée (mêmes
+    résultats que _format_hms_ms).
+    
+    Args:
+        seconds: Liste des instants en secondes
+    
+    Returns:
+        tuple: (liste des HH:MM:SS, liste des mmm)
+    """
+    seconds = np.asarray(seconds, dtype=np.float64)
+    if seconds.size == 0:
+        return [], []
+    
+    hours = (seconds // 3600).astype(np.int64)
+    minutes = ((seconds % 3600) // 60).astype(np.int64)
+    secs = (seconds % 60).astype(np.int64)
+    millis = ((seconds % 1) * 1000).astype(np.int64)
+    
+    # Concaténations et zfill dans les boucles C de np.char
+    hms = np.char.zfill(hours.astype(str), 2)
+    hms = np.char.add(np.char.add(hms, ":"), np.char.zfill(minutes.astype(str), 2))
+    hms = np.char.add(np.char.add(hms, ":"), np.char.zfill(secs.astype(str), 2))
+    return hms.tolist(), np.char.zfill(millis.astype(str), 3).tolist()
 
 
 def main():
@@ -245,6 +688,7 @@ def main():
     print("   - small  : Plus précis, plus lent")
     print("   - medium : Très précis, lent")
     print("   - large  : Maximum précision, très lent")
+    print("   - distil-large-v3 : Précision ~medium, ~6x plus rapide (anglais uniquement)")
     
     # Transcrire diane_ann
     video_file = "diane_ann.mp4"